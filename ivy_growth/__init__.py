@@ -0,0 +1,44 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+#  Ivy Growth Animator add-on. Install the ivy_growth directory (or a zip of it)
+#  as the add-on.
+#
+#  The add-on (addon.py) is only imported when it is registered: the worker
+#  processes of the nearest branch search import core.py, and with it this
+#  package, outside of Blender.
+
+bl_info = {
+    "name"        : "Ivy Growth Animator",
+    "author"      : "Tamir Lousky && Andrej (remaster 2.74->3.2)",
+    "version"     : (1, 0, 4),
+    "blender"     : (3, 2, 0),
+    "category"    : "Object",
+    "location"    : "3D View >> Tools",
+    "wiki_url"    : "http://bioblog3d.wordpress.com/2013/02/06/iga-is-ready/",
+    "download_url": "https://github.com/Tlousky/ivy_growth_animator",
+    "description" : "Animate the growth of Ivy and Trees."
+    }
+
+def register():
+    from . import addon
+    addon.register()
+
+def unregister():
+    from . import addon
+    addon.unregister()
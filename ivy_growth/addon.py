@@ -0,0 +1,2752 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+#
+#  Author            : Tamir Lousky (tlousky@gmail.com)
+#
+#  Homepage(Wiki)    : http://biological3d.wordpress.com/
+#
+#  Start of project              : 2013-01-21 by Tamir Lousky
+#  Last modified                 : 2015-05-25 by Tamir Lousky
+#
+#  Acknowledgements
+#  ================
+#
+#  Blender: Patrick Boelens (tuts on CG Cookie!), batFINGER (explained how to
+#           keyframe shapekeys on BA forum!), CoDEmanX (useful bmesh API info
+#           on BA forums!), frigge (explained how to create an object selection
+#           box on BA forums!), anyone who took the time to contribute to the
+#           API docs!
+
+#  The add-on itself: operators, panel and property groups. The package's
+#  __init__ registers it, the math it runs on is in core.
+
+import bpy, mathutils
+import cProfile, contextlib, hashlib, os, time
+import mathutils.bvhtree, mathutils.kdtree
+import numpy as np
+from bpy.app.handlers import persistent
+
+from .core import (
+    BRANCH_SCHEDULE_DTYPE, LEAF_CLUSTERED, LEAF_SCHEDULE_DTYPE, LEAF_STATIC, GrowthCache, ManhattanIndex, NearestPool, cKDTree,
+    build_positions, classify_leaves, cluster_leaves, collapse_faces, compute_appear_frames,
+    compute_build_timing, current_rss_mb, draw_leaf_timing, empty_mesh, face_appear_frames, face_radii,
+    find_loose_parts, merge_meshes, schedule_leaves, sort_faces_by_distance, split_by_part, transform_points )
+
+# Growth start and end frames of leaves that are not animated (always at full size)
+ALWAYS_GROWN_FRAMES = ( -1048576.0, -1048575.0 )
+# Growth start and end frames of leaves that only start growing after the frame range (always hidden)
+NEVER_GROWN_FRAMES  = ( 1048575.0, 1048576.0 )
+
+# Names used by the attribute based leaf growth mode
+LEAF_GROWTH_NODE_GROUP    = "IvyLeafGrowth"
+LEAF_GROWTH_MODIFIER      = "IVY_LEAF_GROWTH"
+LEAF_GROW_START_ATTRIBUTE = "ivy_grow_start"
+LEAF_GROW_END_ATTRIBUTE   = "ivy_grow_end"
+
+# Names used by the single mesh branch mode
+BRANCH_GROWTH_NODE_GROUP  = "IvyBranchGrowth"
+BRANCH_PART_ATTRIBUTE     = "ivy_branch"
+BRANCH_APPEAR_ATTRIBUTE   = "ivy_appear_frame"
+BRANCH_STARTS_PROPERTY    = "ivy_branch_starts"
+BRANCH_DURATIONS_PROPERTY = "ivy_branch_durations"
+
+# Registry of the branch objects, stored on the first branch by prepare_ivy_object
+BRANCH_REGISTRY_PROPERTY   = "ivy_branches"
+BRANCH_FACECOUNTS_PROPERTY = "ivy_branch_facecounts"
+
+# Cached leaf to branch assignment, stored on the leaves object
+LEAF_BRANCHES_PROPERTY      = "ivy_leaf_branches"
+LEAF_POSITIONS_PROPERTY     = "ivy_leaf_positions"
+LEAF_BRANCHES_HASH_PROPERTY = "ivy_leaf_branches_hash"
+
+# Leaf whose timing every leaf shares after camera culling (-1: culled, always grown,
+# HIDDEN_CLUSTER: never grown), stored on the leaves object
+LEAF_CLUSTERS_PROPERTY = "ivy_leaf_clusters"
+HIDDEN_CLUSTER         = -2
+
+# Shape key collapsing the leaves that are never grown (shape key growth mode, camera culling)
+HIDDEN_LEAVES_SHAPE_KEY = "Hidden leaves"
+
+# Growth mode the leaves were last animated in, stored on the leaves object
+LEAF_GROWTH_MODE_PROPERTY = "ivy_leaf_growth_mode"
+
+# Growth cache file of a playback object, stored on the object
+BAKE_FILEPATH_PROPERTY = "ivy_bake_filepath"
+BAKE_UV_LAYER          = "UVMap"
+
+class IvyGrowthAnimator( bpy.types.Panel ):
+    bl_idname      = "IvyGrowthAnimatorPanel"
+    bl_label       = "Ivy Growth Animator"
+    bl_category    = "Ivy Animator"
+    bl_space_type  = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_context     = 'objectmode'
+
+    # Draw panel UI elements #
+    def draw( self, context):
+        layout = self.layout
+        obj = context.object
+
+        BranchesAnimProperties = context.scene.BranchesAnimProperties
+        LeavesAnimProperties   = context.scene.LeavesAnimProperties
+        scn = context.scene
+
+        col = layout.column()
+        col.prop_search(
+            scn, "BranchObject",      # Pick BranchObject out of
+            scn, "objects"  # the list of objects in the scene
+            )
+        col.prop_search(
+            scn, "LeavesObject",      # Pick LeavesObject out of
+            scn, "objects"  # the list of objects in the scene
+            )
+
+        box = layout.box()
+        col = box.operator( "object.animate_branches" )
+        col = box.operator( "object.animate_leaves"   )
+        col = box.operator( "object.retime_leaves"    )
+        col = box.operator( "object.bake_growth"      )
+
+        col = layout.column()
+        col.label(text="Animation Paremeters")
+
+        box = layout.box()
+        box.label(text="Branches animation parameters"      )
+
+        # col.prop_search(scn, "frame_start", scn, "objects", text="") 
+
+        box.prop( BranchesAnimProperties, "frame_start"     )
+        box.prop( BranchesAnimProperties, "faces_per_frame" )
+        box.prop( BranchesAnimProperties, "delay_branches"  )
+        box.prop( BranchesAnimProperties, "use_initial_delay" )
+        if BranchesAnimProperties.use_initial_delay:
+            box.prop( BranchesAnimProperties, "initial_delay" )
+        box.prop( BranchesAnimProperties, "preparation_method" )
+        box.prop( BranchesAnimProperties, "branch_mode" )
+
+        box = layout.box()
+        box.label(text="Leaves animation parameters"         )
+
+        box.prop( LeavesAnimProperties, "delay_after_branch" )
+        box.prop( LeavesAnimProperties, "max_growth_length"  )
+        box.prop( LeavesAnimProperties, "min_growth_length"  )
+        box.prop( LeavesAnimProperties, "seed" )
+        box.prop( LeavesAnimProperties, "delay_distribution" )
+        box.prop( LeavesAnimProperties, "use_surface_distance" )
+        box.prop( LeavesAnimProperties, "assignment_processes" )
+        box.prop( LeavesAnimProperties, "growth_mode" )
+        if LeavesAnimProperties.growth_mode == 'ATTRIBUTE':
+            box.prop( LeavesAnimProperties, "stream_chunk_size" )
+        box.prop( LeavesAnimProperties, "use_camera_culling" )
+        if LeavesAnimProperties.use_camera_culling:
+            box.prop( LeavesAnimProperties, "min_pixel_size" )
+            box.prop( LeavesAnimProperties, "cluster_size" )
+            box.prop( LeavesAnimProperties, "culling_frame_step" )
+        box.prop( LeavesAnimProperties, "keep_partial_results" )
+
+        box = layout.box()
+        box.label(text="Ivies animated together")
+
+        row = box.row()
+        row.template_list( "IVY_UL_ivy_pairs", "", scn, "IvyPairs", scn, "IvyPairsIndex", rows=3 )
+        col = row.column( align=True )
+        col.operator( "object.add_ivy_pair",    icon='ADD',    text="" )
+        col.operator( "object.remove_ivy_pair", icon='REMOVE', text="" )
+
+        if 0 <= scn.IvyPairsIndex < len( scn.IvyPairs ):
+            pair = scn.IvyPairs[ scn.IvyPairsIndex ]
+            box.prop_search( pair, "branch_object", scn, "objects" )
+            box.prop_search( pair, "leaves_object", scn, "objects" )
+            box.prop( pair, "frame_offset" )
+        box.operator( "object.animate_ivy_pairs" )
+
+        BakeProperties = context.scene.BakeProperties
+
+        box = layout.box()
+        box.label(text="Bake parameters")
+
+        box.prop( BakeProperties, "bake_filepath" )
+        box.prop( BakeProperties, "hide_sources"  )
+
+        ProfilingProperties = context.scene.ProfilingProperties
+
+        box = layout.box()
+        box.label(text="Profiling")
+
+        box.prop( ProfilingProperties, "print_summary" )
+        box.prop( ProfilingProperties, "write_stats"   )
+        if ProfilingProperties.write_stats:
+            box.prop( ProfilingProperties, "stats_filepath" )
+
+# List of the ivies animated together by Animate All Ivies
+class IVY_UL_ivy_pairs( bpy.types.UIList ):
+
+    def draw_item( self, context, layout, data, item, icon, active_data, active_propname, index ):
+        row = layout.row( align=True )
+        row.prop( item, "enabled", text="" )
+        row.label( text="%s / %s" % ( item.branch_object or "-", item.leaves_object or "-" ) )
+        row.label( text="%+d" % item.frame_offset )
+
+class StageProfiler:
+    """ class name:     StageProfiler
+        description:    Collects the time spent in every stage of an animation run and counters
+                        (leaves, branches, shape keys...), reports progress through the window
+                        manager's progress indicator and optionally records cProfile stats and the
+                        memory high-water mark
+    """
+
+    def __init__( self, window_manager=None, progress_interval=0.1 ):
+        """ parameters:     window_manager    [WindowManager] - Reports progress through it (optional)
+                            progress_interval [Float]         - Minimum seconds between progress updates
+        """
+        self.window_manager    = window_manager
+        self.progress_interval = progress_interval
+        self.timings           = {}
+        self.counters          = {}
+        self.cprofile          = None
+        self.last_progress     = 0.0
+        self.memory            = {}     # Sampled process memory (MB)
+
+    @classmethod
+    def for_context( cls, context ):
+        """ Creates a profiler for an operator, with cProfile enabled if requested in the panel.
+            Used as a with block, cProfile is disabled again however the operator returns
+        """
+        profiler = cls( context.window_manager )
+        if context.scene.ProfilingProperties.write_stats:
+            profiler.cprofile = cProfile.Profile()
+            profiler.cprofile.enable()
+        return profiler
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
+
+    def close( self ):
+        """ Disables cProfile, for runs that end without finish() (cancelled or failed) """
+        if self.cprofile is not None:
+            self.cprofile.disable()
+
+    @contextlib.contextmanager
+    def stage( self, name ):
+        """ Adds the time spent inside the with block to the stage """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get( name, 0.0 ) + time.perf_counter() - start
+
+    def count( self, name, amount=1 ):
+        self.counters[name] = self.counters.get( name, 0 ) + amount
+
+    def sample_memory( self ):
+        """ Samples the memory of the whole process (Blender's own allocations included). The first
+            sample is kept as the memory at the start, the highest as the high-water mark
+        """
+        megabytes = current_rss_mb()
+        if megabytes is None:
+            return
+        self.memory.setdefault( "memory at start", megabytes )
+        self.memory["sampled peak memory"] = max( self.memory.get( "sampled peak memory", 0.0 ), megabytes )
+
+    def progress_begin( self, total ):
+        self.last_progress = 0.0
+        if self.window_manager is not None:
+            self.window_manager.progress_begin( 0, max( total, 1 ) )
+
+    def progress_update( self, done ):
+        """ Updates the progress indicator, at most once per progress interval """
+        now = time.perf_counter()
+        if self.window_manager is None or now - self.last_progress < self.progress_interval:
+            return
+        self.last_progress = now
+        self.window_manager.progress_update( done )
+
+    def progress_end( self ):
+        if self.window_manager is not None:
+            self.window_manager.progress_end()
+
+    def summary( self ):
+        """ One line with the time of every stage and every counter """
+        stages   = ", ".join( "%s %.2fs" % ( name, seconds ) for name, seconds in self.timings.items() )
+        counters = ", ".join( "%s %d" % ( name, amount ) for name, amount in self.counters.items() )
+        memory   = ", ".join( "%s %.1f MB" % ( name, megabytes ) for name, megabytes in self.memory.items() )
+        return "; ".join( part for part in ( stages, counters, memory ) if part )
+
+    def finish( self, operator, context ):
+        """ function name:  finish
+            parameters:     operator [Operator] - The operator that was profiled
+                            context  [Context]
+            description:    Reports the summary, prints it and writes the cProfile stats
+                            when requested in the panel
+        """
+        props = context.scene.ProfilingProperties
+        operator.report( {'INFO'}, "Ivy Growth Animator: " + self.summary() )
+
+        if props.print_summary:
+            print( "Ivy Growth Animator - %s" % operator.bl_label )
+            for name, seconds in self.timings.items():
+                print( "    %-26s %9.3fs" % ( name, seconds ) )
+            for name, amount in self.counters.items():
+                print( "    %-26s %9d" % ( name, amount ) )
+            for name, megabytes in self.memory.items():
+                print( "    %-26s %9.1f MB" % ( name, megabytes ) )
+
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats( bpy.path.abspath( props.stats_filepath ) )
+
+class MeshGeometry:
+    """ class name:     MeshGeometry
+        description:    Bulk snapshot of a mesh's geometry in NumPy arrays. Everything is read with a
+                        single foreach_get per attribute and transformed to world space with one matrix
+                        multiplication, so later stages never touch the mesh's RNA data per element
+        attributes:     co            [(V, 3) float array] - Vertex coordinates
+                        centers       [(F, 3) float array] - Polygon centers
+                        loop_start    [(F,) int array]     - Index of each polygon's first loop
+                        loop_total    [(F,) int array]     - Number of loops (vertices) in each polygon
+                        loop_vertices [(L,) int array]     - Vertex index of every loop
+    """
+
+    def __init__( self, mesh, matrix=None ):
+        """ parameters:     mesh   [Mesh]   - The mesh data block to read
+                            matrix [Matrix] - Optional transformation (usually matrix_world) to
+                                              apply to the coordinates and centers
+        """
+        vert_count = len( mesh.vertices )
+        face_count = len( mesh.polygons  )
+        loop_count = len( mesh.loops     )
+
+        self.co = np.empty( vert_count * 3, dtype=np.float32 )
+        mesh.vertices.foreach_get( "co", self.co )
+        self.co = self.co.reshape( -1, 3 )
+
+        self.centers = np.empty( face_count * 3, dtype=np.float32 )
+        mesh.polygons.foreach_get( "center", self.centers )
+        self.centers = self.centers.reshape( -1, 3 )
+
+        self.loop_start = np.empty( face_count, dtype=np.int32 )
+        mesh.polygons.foreach_get( "loop_start", self.loop_start )
+
+        self.loop_total = np.empty( face_count, dtype=np.int32 )
+        mesh.polygons.foreach_get( "loop_total", self.loop_total )
+
+        self.loop_vertices = np.empty( loop_count, dtype=np.int32 )
+        mesh.loops.foreach_get( "vertex_index", self.loop_vertices )
+
+        if matrix is not None:
+            self.co      = transform_points( self.co,      matrix )
+            self.centers = transform_points( self.centers, matrix )
+
+    @classmethod
+    def from_object( cls, obj, world_space=True ):
+        return cls( obj.data, obj.matrix_world if world_space else None )
+
+    def __len__( self ):
+        return len( self.loop_start )
+
+    def face_vertices( self, face_idx ):
+        """ function name:  face_vertices
+            parameters:     face_idx [Int] - Index of the polygon
+            return value:   Array with the vertex indices of the polygon
+        """
+        start = self.loop_start[face_idx]
+        return self.loop_vertices[ start : start + self.loop_total[face_idx] ]
+
+    def polygons( self ):
+        """ function name:  polygons
+            return value:   List with the vertex indices of every polygon
+        """
+        if len( self ) == 0:
+            return []
+        return [ face.tolist() for face in np.split( self.loop_vertices, self.loop_start[1:] ) ]
+
+def manhattan_distance( pt1, pt2 ):
+    return abs(pt1[0] - pt2[0]) + abs(pt1[1] - pt2[1]) + abs(pt1[2] - pt2[2])
+
+class KDTreeIndex:
+    """ class name:     KDTreeIndex
+        description:    Finds the nearest point by the sum of axis distances (manhattan distance) with
+                        Blender's KD-tree: the nearest point by euclidean distance bounds the search, and
+                        the points within that distance are ranked by the sum of axis distances. Same
+                        results as ManhattanIndex, and faster than its NumPy search (used without SciPy)
+    """
+
+    def __init__( self, points ):
+        """ parameters:     points [(N, 3) float array] - The points to search """
+        self.points = np.asarray( points, dtype=np.float64 ).reshape( -1, 3 )
+        self.tree   = mathutils.kdtree.KDTree( len( self.points ) )
+        for point_idx, point in enumerate( self.points.tolist() ):
+            self.tree.insert( point, point_idx )
+        self.tree.balance()
+
+    def __len__( self ):
+        return len( self.points )
+
+    def query( self, queries ):
+        """ function name:  query
+            parameters:     queries [(Q, 3) float array] - The points to find the nearest point for
+            return value:   Index of the nearest point of every query, or -1 if there are no points
+        """
+        queries = np.asarray( queries, dtype=np.float64 ).reshape( -1, 3 )
+        if len( self.points ) == 0:
+            return np.full( len( queries ), -1, dtype=np.int64 )
+
+        nearest = np.empty( len( queries ), dtype=np.int64 )
+        for query_idx, query in enumerate( queries.tolist() ):
+            co, point_idx, distance = self.tree.find( query )
+
+            # The axis distance sum is never smaller than the euclidean distance, so the
+            # point with the smallest sum has to be within that range of the query
+            minimum_distance = manhattan_distance( co, query )
+            for co, idx, distance in self.tree.find_range( query, minimum_distance ):
+                current_distance = manhattan_distance( co, query )
+                if current_distance < minimum_distance:
+                    minimum_distance = current_distance
+                    point_idx        = idx
+
+            nearest[query_idx] = point_idx
+        return nearest
+
+class BranchIndex:
+    """ class name:     BranchIndex
+        description:    Spatial index over the faces of all ivy branches. Every face center is stored
+                        in a single KD-tree (and optionally every face in a BVH tree) tagged with
+                        the branch that owns it, so finding the nearest branch of all leaves is one
+                        vectorized query instead of a scan over every face of every branch
+    """
+
+    def __init__( self, ivy_objects, use_surface_distance=False, branch_geometry=None, processes=1 ):
+        """ parameters:     ivy_objects          [List]    - Array of ivy branches (name and facecount)
+                            use_surface_distance [Boolean] - Measure the exact distance to the branch
+                                                             surface instead of the distance to face centers
+                            branch_geometry      [Tuple]   - The result of read_branch_geometry, if it
+                                                             was already read (optional)
+                            processes            [Int]     - Worker processes of the face center search
+        """
+        self.ivy_objects          = ivy_objects
+        self.use_surface_distance = use_surface_distance
+        self.processes            = processes
+
+        geometries, self.face_branch, self.face_position = branch_geometry or read_branch_geometry( ivy_objects )
+        self.geometries = geometries
+
+        self.centers = np.concatenate( [ geometry.centers for geometry in geometries ] ) \
+                       if geometries else np.empty( ( 0, 3 ) )
+
+        self.index = None
+        self.bvh   = None
+        self.pool  = None   # Worker processes, started by the first assignment that uses them
+        if use_surface_distance:
+            vertices = []
+            polygons = []
+            for geometry in geometries:
+                offset   = len( vertices )
+                vertices.extend( geometry.co.tolist() )
+                polygons.extend( [ v + offset for v in face ] for face in geometry.polygons() )
+            self.bvh = mathutils.bvhtree.BVHTree.FromPolygons( vertices, polygons )
+        elif processes <= 1:
+            self.index = ManhattanIndex( self.centers ) if cKDTree is not None else KDTreeIndex( self.centers )
+
+    def find_nearest_index( self, glob_co ):
+        """ function name:  find_nearest_index
+            parameters:     glob_co [Vector] - global coordinates to match with the nearest branch
+            description:    Finds the branch closest to the coordinates. By default the distance is the
+                            same sum of axis distances to the nearest face center that was always used,
+                            with use_surface_distance the true distance to the branch surface is used
+            return value:   Index of the closest ivy branch in ivy_objects, or -1 if there are
+                            no branch faces at all
+        """
+        return int( self.assign( np.array( [ glob_co ] ) )[0] )
+
+    def find_nearest( self, glob_co ):
+        """ function name:  find_nearest
+            parameters:     glob_co [Vector] - global coordinates to match with the nearest branch
+            return value:   The closest ivy branch (dictionary with name and facecount), or None
+                            if there are no branch faces at all
+        """
+        branch_idx = self.find_nearest_index( glob_co )
+        return self.ivy_objects[branch_idx] if branch_idx >= 0 else None
+
+    def assign_faces( self, centers ):
+        """ function name:  assign_faces
+            parameters:     centers [(N, 3) float array] - global coordinates of all the leaves
+            return value:   Array with the index of the closest branch face for every leaf (-1 if
+                            there are no branch faces at all)
+        """
+        if len( self.face_branch ) == 0:
+            return np.full( len( centers ), -1, dtype=np.int64 )
+
+        if self.bvh is not None:
+            return np.fromiter(
+                ( face_idx for location, normal, face_idx, distance in map( self.bvh.find_nearest, centers ) ),
+                dtype=np.int64, count=len( centers ) )
+        if self.index is None:  # Split the search across the worker processes, started once for all searches
+            return NearestPool.result( self.assign_faces_async( centers ) )
+        return self.index.query( centers )
+
+    def assign( self, centers ):
+        """ function name:  assign
+            parameters:     centers [(N, 3) float array] - global coordinates of all the leaves
+            return value:   Array with the index of the closest branch for every leaf (-1 if
+                            there are no branch faces at all)
+        """
+        faces = self.assign_faces( centers )
+        if len( self.face_branch ) == 0:
+            return faces.astype( np.int32 )
+        return self.face_branch[ faces ].astype( np.int32 )
+
+    @property
+    def uses_processes( self ):
+        return self.index is None and self.bvh is None and len( self.face_branch ) > 0
+
+    def assign_faces_async( self, centers ):
+        """ function name:  assign_faces_async
+            parameters:     centers [(N, 3) float array] - global coordinates of the leaves
+            description:    Starts the search of assign_faces in the worker processes (only when
+                            uses_processes), so the caller can keep responding while it runs
+            return value:   The pending search, NearestPool.result() returns its faces
+        """
+        if self.pool is None:
+            self.pool = NearestPool( self.centers, self.processes )
+        return self.pool.query_async( centers )
+
+    def close( self ):
+        """ Stops the worker processes, and any search still running in them """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+def read_branch_geometry( ivy_objects ):
+    """ function name:  read_branch_geometry
+        parameters:     ivy_objects [List] - Array of ivy branches (name and facecount)
+        description:    Reads every branch object once, even when its loose parts are separate branches
+        return value:   List with the MeshGeometry (world space) of every object, an array with the
+                        index of the owning branch of every face of these objects, and an array with
+                        the fraction of its branch's build after which every face appears
+    """
+    geometries    = []
+    face_branch   = []
+    face_position = []
+    for name, branches in group_branches_by_object( ivy_objects ).items():
+        obj      = bpy.data.objects[name]
+        geometry = MeshGeometry.from_object( obj )
+        geometries.append( geometry )
+
+        if "part" in ivy_objects[ branches[0] ]:
+            part_branch = np.zeros( len( branches ), dtype=np.int32 )
+            part_branch[ [ ivy_objects[idx]["part"] for idx in branches ] ] = branches
+            face_parts  = read_face_attribute( obj.data, BRANCH_PART_ATTRIBUTE, 'INT' )
+            face_branch.append( part_branch[ face_parts ] )
+            face_position.append( build_positions( face_parts, len( branches ) ) )
+        else:
+            face_branch.append( np.full( len( geometry ), branches[0], dtype=np.int32 ) )
+            face_position.append( np.arange( 1, len( geometry ) + 1 ) / max( len( geometry ), 1 ) )
+
+    if not geometries:
+        return geometries, np.empty( 0, dtype=np.int32 ), np.empty( 0 )
+    return geometries, np.concatenate( face_branch ), np.concatenate( face_position )
+
+def geometry_hash( geometries, *arrays ):
+    """ function name:  geometry_hash
+        parameters:     geometries [List of MeshGeometry] - The meshes to hash
+                        arrays     [Arrays]               - Any other data the hash depends on
+        return value:   Hex digest that changes whenever the (world space) geometry changes
+    """
+    digest = hashlib.sha1()
+    for geometry in geometries:
+        for array in ( geometry.co, geometry.loop_total, geometry.loop_vertices ):
+            digest.update( np.ascontiguousarray( array ).tobytes() )
+    for array in arrays:
+        digest.update( np.ascontiguousarray( array ).tobytes() )
+    return digest.hexdigest()
+
+def read_split_data( mesh ):
+    """ function name:  read_split_data
+        parameters:     mesh [Mesh] - The mesh that is split into parts
+        description:    Reads the face and loop data that split_mesh copies, once for all the parts
+        return value:   Dictionary with the material index and smooth shading of every face, and the
+                        UVs of every UV map
+    """
+    face_count = len( mesh.polygons )
+    split_data = { "material_index" : np.empty( face_count, dtype=np.int32 ),
+                   "use_smooth"     : np.empty( face_count, dtype=bool ),
+                   "uv_layers"      : {} }
+    for prop in ( "material_index", "use_smooth" ):
+        mesh.polygons.foreach_get( prop, split_data[prop] )
+
+    for uv_layer in mesh.uv_layers:
+        uvs = np.empty( len( mesh.loops ) * 2, dtype=np.float32 )
+        uv_layer.data.foreach_get( "uv", uvs )
+        split_data["uv_layers"][ uv_layer.name ] = uvs.reshape( -1, 2 )
+    return split_data
+
+def split_mesh( mesh, geometry, edges, faces, vertices, part_edges, name, split_data ):
+    """ function name:  split_mesh
+        parameters:     mesh       [Mesh]             - The mesh to copy a part of
+                        geometry   [MeshGeometry]     - The mesh's geometry (object space)
+                        edges      [(E, 2) int array] - Vertex indices of every edge of the mesh
+                        faces      [Int array]        - The faces to copy, in their new order
+                        vertices   [Int array]        - The vertices to copy (ascending)
+                        part_edges [Int array]        - The edges to copy (ascending)
+                        name       [String]           - Name of the new mesh
+                        split_data [Dictionary]       - The mesh's face and loop data (see read_split_data)
+        description:    Creates a new mesh from a part of another mesh, in bulk. Materials,
+                        material indices, smooth shading and UV maps are copied along. The work only
+                        depends on the size of the part, so splitting into many parts stays linear
+        return value:   The new mesh
+    """
+    def vert_map( indices ):  # New index of the part's vertices, they are ascending
+        return np.searchsorted( vertices, indices ).astype( np.int32 )
+
+    loop_total = geometry.loop_total[ faces ]
+    loop_start = np.zeros( len( faces ), dtype=np.int32 )
+    np.cumsum( loop_total[:-1], out=loop_start[1:] )
+
+    # Indices of the original loops, in the new loop order
+    loops = np.repeat( geometry.loop_start[ faces ] - loop_start, loop_total ) + \
+            np.arange( loop_total.sum(), dtype=np.int32 )
+
+    part_mesh = bpy.data.meshes.new( name )
+    part_mesh.vertices.add( len( vertices ) )
+    part_mesh.vertices.foreach_set( "co", geometry.co[ vertices ].ravel() )
+    part_mesh.edges.add( len( part_edges ) )
+    part_mesh.edges.foreach_set( "vertices", vert_map( edges[ part_edges ] ).ravel() )
+    part_mesh.loops.add( len( loops ) )
+    part_mesh.loops.foreach_set( "vertex_index", vert_map( geometry.loop_vertices[ loops ] ) )
+    part_mesh.polygons.add( len( faces ) )
+    part_mesh.polygons.foreach_set( "loop_start", loop_start )
+    if not bpy.types.MeshPolygon.bl_rna.properties["loop_total"].is_readonly:  # Before Blender 4.0
+        part_mesh.polygons.foreach_set( "loop_total", loop_total )
+
+    for material in mesh.materials:
+        part_mesh.materials.append( material )
+
+    for prop in ( "material_index", "use_smooth" ):
+        part_mesh.polygons.foreach_set( prop, split_data[prop][ faces ] )
+
+    for uv_name, uvs in split_data["uv_layers"].items():
+        part_mesh.uv_layers.new( name=uv_name ).data.foreach_set( "uv", uvs[ loops ].ravel() )
+
+    part_mesh.update( calc_edges=True )
+    return part_mesh
+
+def new_fcurve( id_data, data_path ):
+    """ function name:  new_fcurve
+        parameters:     id_data   [ID]     - The data block to animate (e.g. a shape key data block)
+                        data_path [String] - RNA path of the animated property
+        description:    Creates (or finds) the F-curve of a property in the data block's action,
+                        creating the animation data and the action when needed
+        return value:   The F-curve
+    """
+    anim_data = id_data.animation_data or id_data.animation_data_create()
+    if anim_data.action is None:
+        anim_data.action = bpy.data.actions.new( id_data.name + "Action" )
+    action = anim_data.action
+
+    if hasattr( action, "fcurve_ensure_for_datablock" ):  # Layered actions (Blender 4.4+)
+        return action.fcurve_ensure_for_datablock( id_data, data_path )
+
+    return action.fcurves.find( data_path ) or action.fcurves.new( data_path )
+
+def write_keyframes( fcurve, frames, values ):
+    """ function name:  write_keyframes
+        parameters:     fcurve [FCurve]      - The F-curve to write into
+                        frames [Float array] - Frame of every keyframe
+                        values [Float array] - Value of every keyframe
+        description:    Allocates all the keyframe points at once and sets their coordinates in bulk.
+                        Existing keyframe points are reused, so an F-curve can be rewritten in place
+    """
+    co = np.empty( ( len( frames ), 2 ), dtype=np.float32 )
+    co[:, 0] = frames
+    co[:, 1] = values
+
+    points = fcurve.keyframe_points
+    while len( points ) > len( frames ):
+        points.remove( points[-1], fast=True )
+    if len( points ) < len( frames ):
+        points.add( len( frames ) - len( points ) )
+    points.foreach_set( "co", co.ravel() )
+    fcurve.update()  # Sort the keyframes and recalculate their handles
+
+def new_geometry_node_group( name ):
+    """ function name:  new_geometry_node_group
+        parameters:     name [String] - Name of the new node group
+        description:    Creates a geometry node group with a geometry input and output
+        return value:   The node group, and its group input and output nodes
+    """
+    group = bpy.data.node_groups.new( name, 'GeometryNodeTree' )
+
+    if hasattr( group, "interface" ):  # Blender 4.0+
+        group.interface.new_socket( "Geometry", in_out='INPUT',  socket_type='NodeSocketGeometry' )
+        group.interface.new_socket( "Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry' )
+    else:
+        group.inputs.new(  'NodeSocketGeometry', "Geometry" )
+        group.outputs.new( 'NodeSocketGeometry', "Geometry" )
+
+    group_input  = group.nodes.new( 'NodeGroupInput'  )
+    group_output = group.nodes.new( 'NodeGroupOutput' )
+    group_output.location = ( 800, 0 )
+
+    return group, group_input, group_output
+
+def enabled_socket( sockets, name ):
+    """ Returns the socket with this name that is available for the node's current data type
+        (some nodes have one socket with the same name per data type)
+    """
+    return next( socket for socket in sockets if socket.name == name and socket.enabled )
+
+def named_attribute_node( group, attribute_name ):
+    """ Adds a node that reads the float attribute attribute_name, and returns its output socket """
+    node = group.nodes.new( 'GeometryNodeInputNamedAttribute' )
+    node.data_type = 'FLOAT'
+    node.inputs["Name"].default_value = attribute_name
+    return enabled_socket( node.outputs, "Attribute" )
+
+def ensure_leaf_growth_node_group():
+    """ function name:  ensure_leaf_growth_node_group
+        description:    Creates the geometry nodes group that animates the leaves in attribute mode
+                        (unless it already exists). Every leaf is scaled around its center from 0 to 1
+                        between the frames stored in its growth start and end face attributes
+        return value:   The node group
+    """
+    group = bpy.data.node_groups.get( LEAF_GROWTH_NODE_GROUP )
+    if group is not None:
+        return group
+
+    group, group_input, group_output = new_geometry_node_group( LEAF_GROWTH_NODE_GROUP )
+    nodes, links = group.nodes, group.links
+
+    scene_time = nodes.new( 'GeometryNodeInputSceneTime' )
+    grow_start = named_attribute_node( group, LEAF_GROW_START_ATTRIBUTE )
+    grow_end   = named_attribute_node( group, LEAF_GROW_END_ATTRIBUTE   )
+
+    growth = nodes.new( 'ShaderNodeMapRange' )  # Growth factor: 0 before the start frame, 1 after the end
+    growth.clamp = True
+    growth.location = ( 300, 0 )
+    links.new( scene_time.outputs["Frame"], growth.inputs[0] )  # Value
+    links.new( grow_start,                  growth.inputs[1] )  # From Min
+    links.new( grow_end,                    growth.inputs[2] )  # From Max
+    growth.inputs[3].default_value = 0.0                        # To Min
+    growth.inputs[4].default_value = 1.0                        # To Max
+
+    scale = nodes.new( 'GeometryNodeScaleElements' )  # Scale every leaf around its own center
+    scale.domain   = 'FACE'
+    scale.location = ( 550, 0 )
+    links.new( group_input.outputs[0],  scale.inputs["Geometry"] )
+    links.new( growth.outputs[0],       scale.inputs["Scale"]    )
+    links.new( scale.outputs[0],        group_output.inputs[0]   )
+
+    return group
+
+def ensure_branch_growth_node_group():
+    """ function name:  ensure_branch_growth_node_group
+        description:    Creates the geometry nodes group that animates an ivy kept as a single mesh
+                        (unless it already exists). Every face is deleted until the frame stored in
+                        its appear frame attribute
+        return value:   The node group
+    """
+    group = bpy.data.node_groups.get( BRANCH_GROWTH_NODE_GROUP )
+    if group is not None:
+        return group
+
+    group, group_input, group_output = new_geometry_node_group( BRANCH_GROWTH_NODE_GROUP )
+    nodes, links = group.nodes, group.links
+
+    scene_time   = nodes.new( 'GeometryNodeInputSceneTime' )
+    appear_frame = named_attribute_node( group, BRANCH_APPEAR_ATTRIBUTE )
+
+    hidden = nodes.new( 'FunctionNodeCompare' )  # Faces that did not appear yet
+    hidden.data_type = 'FLOAT'
+    hidden.operation = 'GREATER_THAN'
+    hidden.location  = ( 300, 0 )
+    links.new( appear_frame,                hidden.inputs[0] )  # A
+    links.new( scene_time.outputs["Frame"], hidden.inputs[1] )  # B
+
+    delete = nodes.new( 'GeometryNodeDeleteGeometry' )
+    delete.domain   = 'FACE'
+    delete.location = ( 550, 0 )
+    links.new( group_input.outputs[0], delete.inputs["Geometry"]  )
+    links.new( hidden.outputs[0],      delete.inputs["Selection"] )
+    links.new( delete.outputs[0],      group_output.inputs[0]     )
+
+    return group
+
+def read_face_attribute( mesh, name, data_type='FLOAT' ):
+    """ function name:  read_face_attribute
+        parameters:     mesh      [Mesh]   - The mesh data block
+                        name      [String] - Name of the per-face attribute
+                        data_type [String] - Attribute type ('FLOAT' or 'INT')
+        return value:   Array with the attribute's value for every polygon
+    """
+    values = np.empty( len( mesh.polygons ), dtype=np.int32 if data_type == 'INT' else np.float32 )
+    mesh.attributes[name].data.foreach_get( "value", values )
+    return values
+
+def write_face_attribute( mesh, name, values, data_type='FLOAT' ):
+    """ function name:  write_face_attribute
+        parameters:     mesh      [Mesh]   - The mesh data block
+                        name      [String] - Name of the attribute
+                        values    [Array]  - One value per polygon
+                        data_type [String] - Attribute type ('FLOAT' or 'INT')
+        description:    Creates (or replaces) a per-face attribute and writes all its values at once
+    """
+    attribute = mesh.attributes.get( name )
+    if attribute is not None and ( attribute.domain != 'FACE' or attribute.data_type != data_type ):
+        mesh.attributes.remove( attribute )
+        attribute = None
+    if attribute is None:
+        attribute = mesh.attributes.new( name, data_type, 'FACE' )
+
+    dtype = np.int32 if data_type == 'INT' else np.float32
+    attribute.data.foreach_set( "value", np.ascontiguousarray( values, dtype=dtype ) )
+
+def register_branches( root_obj, branch_objs ):
+    """ function name:  register_branches
+        parameters:     root_obj    [Mesh obj] - The branch that keeps the ivy's name
+                        branch_objs [List]     - All branch objects of the ivy, in order
+        description:    Stores the names and face counts of the branches on the root branch, so
+                        they can be found again without searching the objects by name
+    """
+    root_obj[BRANCH_REGISTRY_PROPERTY]   = [ branch_obj.name for branch_obj in branch_objs ]
+    root_obj[BRANCH_FACECOUNTS_PROPERTY] = [ len( branch_obj.data.polygons ) for branch_obj in branch_objs ]
+
+def registered_branches( root_obj ):
+    """ function name:  registered_branches
+        parameters:     root_obj [Object] - The branch that keeps the ivy's name (or None)
+        return value:   The registered branches (dictionaries with name and facecount), or None if
+                        there is no registry or one of its branches no longer exists
+    """
+    if root_obj is None or BRANCH_REGISTRY_PROPERTY not in root_obj:
+        return None
+
+    names      = list( root_obj[BRANCH_REGISTRY_PROPERTY] )
+    facecounts = list( root_obj[BRANCH_FACECOUNTS_PROPERTY] )
+    objects    = bpy.data.objects
+    if any( objects.get( name ) is None or objects[name].type != 'MESH' for name in names ):
+        return None
+
+    return [ { "name" : name, "facecount" : int( facecount ) } for name, facecount in zip( names, facecounts ) ]
+
+def group_branches_by_object( ivy_objects ):
+    """ Returns a dictionary with the indices of the branches (in ivy_objects) of every object name """
+    branches = {}
+    for branch_idx, branch in enumerate( ivy_objects ):
+        branches.setdefault( branch["name"], [] ).append( branch_idx )
+    return branches
+
+def leaf_shape_key_name( leaf_idx ):
+    return f"Leaf {leaf_idx}"
+
+def shape_key_data_path( name ):
+    """ Returns the data path of the value of the shape key with this name """
+    return f'key_blocks["{bpy.utils.escape_identifier(name)}"].value'
+
+def action_fcurves( action ):
+    """ Returns the F-curve collections of an action (one per channel bag of a layered action) """
+    if getattr( action, "layers", None ):  # Layered actions (Blender 4.4+)
+        return [ channelbag.fcurves for layer in action.layers
+                 for strip in layer.strips for channelbag in strip.channelbags ]
+    return [ action.fcurves ]
+
+def remove_fcurves( action, data_paths ):
+    """ Removes the F-curves of these data paths from the action """
+    for fcurves in action_fcurves( action ):
+        for fcurve in [ fcurve for fcurve in fcurves if fcurve.data_path in data_paths ]:
+            fcurves.remove( fcurve )
+
+def remove_leaf_shape_keys( leaves ):
+    """ function name:  remove_leaf_shape_keys
+        parameters:     leaves [Mesh obj] - the leaves mesh object
+        description:    Removes the leaves' shape keys and their F-curves (the shape key growth mode's
+                        animation). Other shape keys are kept, the basis too unless nothing else is left
+    """
+    shape_keys = leaves.data.shape_keys
+    if shape_keys is None:
+        return
+
+    leaf_names = { leaf_shape_key_name( leaf_idx ) for leaf_idx in range( len( leaves.data.polygons ) ) }
+    leaf_names.add( HIDDEN_LEAVES_SHAPE_KEY )
+    names      = [ key_block.name for key_block in shape_keys.key_blocks if key_block.name in leaf_names ]
+    if not names:
+        return
+
+    action = shape_keys.animation_data.action if shape_keys.animation_data else None
+    if action is not None:
+        remove_fcurves( action, { shape_key_data_path( name ) for name in names } )
+
+    if len( names ) == len( shape_keys.key_blocks ) - 1:  # Only the basis would be left
+        leaves.shape_key_clear()
+    else:
+        for name in reversed( names ):
+            leaves.shape_key_remove( shape_keys.key_blocks[name] )
+
+def remove_leaf_growth_attributes( leaves ):
+    """ function name:  remove_leaf_growth_attributes
+        parameters:     leaves [Mesh obj] - the leaves mesh object
+        description:    Removes the growth modifier and growth attributes of the leaves (the attribute
+                        growth mode's animation)
+    """
+    modifier = leaves.modifiers.get( LEAF_GROWTH_MODIFIER )
+    if modifier is not None:
+        leaves.modifiers.remove( modifier )
+
+    for name in ( LEAF_GROW_START_ATTRIBUTE, LEAF_GROW_END_ATTRIBUTE ):
+        attribute = leaves.data.attributes.get( name )
+        if attribute is not None:
+            leaves.data.attributes.remove( attribute )
+
+def read_bake_mesh( obj, geometry, materials ):
+    """ function name:  read_bake_mesh
+        parameters:     obj       [Mesh obj]     - The object to bake
+                        geometry  [MeshGeometry] - The object's geometry, in world space
+                        materials [List]         - Material names of the baked mesh so far, the object's
+                                                   materials are added to it ("" for an empty slot)
+        return value:   Mesh dictionary (see core.reorder_faces) with the object's world
+                        space geometry, material indices into materials, smooth shading and active UVs
+    """
+    mesh  = obj.data
+    slots = []
+    for material in mesh.materials or [ None ]:
+        name = material.name if material is not None else ""
+        if name not in materials:
+            materials.append( name )
+        slots.append( materials.index( name ) )
+
+    material_index = np.empty( len( geometry ), dtype=np.int32 )
+    mesh.polygons.foreach_get( "material_index", material_index )
+    smooth = np.empty( len( geometry ), dtype=bool )
+    mesh.polygons.foreach_get( "use_smooth", smooth )
+
+    uv = np.zeros( len( geometry.loop_vertices ) * 2, dtype=np.float32 )
+    if mesh.uv_layers.active is not None:
+        mesh.uv_layers.active.data.foreach_get( "uv", uv )
+
+    return {
+        "co"            : geometry.co.astype( np.float32 ),
+        "loop_total"    : geometry.loop_total,
+        "material"      : np.array( slots, dtype=np.int32 )[ np.minimum( material_index, len( slots ) - 1 ) ],
+        "smooth"        : smooth,
+        "loop_vertices" : geometry.loop_vertices,
+        "uv"            : uv.reshape( -1, 2 ),
+        }
+
+# Growth caches read by the playback objects, by absolute path: ( modification time, GrowthCache )
+loaded_growth_caches = {}
+
+def load_growth_cache( filepath ):
+    """ Returns the GrowthCache of a file (relative to the .blend file), which is only read again
+        when the file changes
+    """
+    path   = bpy.path.abspath( filepath )
+    mtime  = os.path.getmtime( path )
+    loaded = loaded_growth_caches.get( path )
+    if loaded is None or loaded[0] != mtime:
+        loaded = loaded_growth_caches[path] = ( mtime, GrowthCache.load( path ) )
+    return loaded[1]
+
+def write_playback_mesh( mesh, cache, frame ):
+    """ function name:  write_playback_mesh
+        parameters:     mesh  [Mesh]        - The playback object's mesh
+                        cache [GrowthCache] - The baked growth
+                        frame [Float]       - The frame to show
+        description:    Replaces the mesh's geometry with the faces the cache shows at this frame,
+                        in bulk. Its materials are kept
+    """
+    co, faces, loops = cache.frame( frame )
+    loop_total = cache.loop_total[ faces ]
+    loop_start = np.zeros( len( faces ), dtype=np.int32 )
+    np.cumsum( loop_total[:-1], out=loop_start[1:] )
+
+    mesh.clear_geometry()
+    mesh.vertices.add( len( co ) )
+    mesh.vertices.foreach_set( "co", co.astype( np.float32 ).ravel() )
+    mesh.loops.add( len( loops ) )
+    mesh.loops.foreach_set( "vertex_index", cache.loop_vertices[ loops ].astype( np.int32 ) )
+    mesh.polygons.add( len( faces ) )
+    mesh.polygons.foreach_set( "loop_start", loop_start )
+    if not bpy.types.MeshPolygon.bl_rna.properties["loop_total"].is_readonly:  # Before Blender 4.0
+        mesh.polygons.foreach_set( "loop_total", loop_total.astype( np.int32 ) )
+    mesh.polygons.foreach_set( "material_index", cache.material[ faces ].astype( np.int32 ) )
+    mesh.polygons.foreach_set( "use_smooth", cache.smooth[ faces ] )
+    mesh.uv_layers.new( name=BAKE_UV_LAYER ).data.foreach_set( "uv", cache.uv[ loops ].ravel() )
+    mesh.update( calc_edges=True )
+
+@persistent
+def update_growth_playback( scene, depsgraph=None ):
+    """ Frame change handler: rebuilds every playback object of the scene from its growth cache """
+    for obj in scene.objects:
+        filepath = obj.get( BAKE_FILEPATH_PROPERTY )
+        if filepath is None or obj.type != 'MESH':
+            continue
+
+        try:
+            cache = load_growth_cache( filepath )
+        except ( OSError, ValueError ) as error:
+            print( "Can't read the growth cache of %s: %s" % ( obj.name, error ) )
+            continue
+        write_playback_mesh( obj.data, cache, scene.frame_current_final )
+
+# The leaves' animation, in chunks that can be spread over several UI events
+class LeafAnimationJob:
+    """ class name:     LeafAnimationJob
+        description:    The leaves' animation, split into steps so that it can run all at once or in
+                        chunks (from a modal operator). start() reads the leaves and indexes the
+                        branches, every step() assigns, times and animates the next leaves, finish()
+                        writes what is stored for all leaves at once, and rollback() removes
+                        everything a cancelled job created.
+                        The leaf to branch assignment is cached on the leaves object, keyed by a hash
+                        of the leaves' and branches' geometry, so as long as neither changes the
+                        nearest branch search is skipped. A retiming job only rewrites the timing
+                        of leaves that are already animated, all in finish().
+                        With a stream chunk size (attribute growth mode only, every shape key holds all
+                        vertices of the mesh), leaf centers are moved to world space, matched and timed
+                        one chunk at a time, and the growth attributes are written after every chunk, so
+                        the temporary arrays of every step are bounded by the chunk size. The per leaf
+                        arrays (two values per leaf in Blender, a few in the job) still grow with the
+                        leaf count, and start() reads the geometry of all leaves, keeping only the
+                        centers. The process memory is sampled after every chunk, and the highest sample
+                        reported. A rollback puts back the attributes the run overwrote.
+                        With camera culling, leaves the camera never sees (or that are fully grown before
+                        the frame range) keep the always grown timing, and leaves too small to tell apart
+                        take the timing of the first leaf of their cluster, which also collapses them all
+                        in its shape key. Only the first leaves of the clusters are assigned and animated
+    """
+
+    def __init__( self, leaves_props, leaves, ivy_objects, profiler=None, retime=False, branch_index=None ):
+        """ parameters:     leaves_props [LeavesAnimProperties] - The leaves animation settings
+                            leaves       [Mesh obj]             - the leaves mesh object
+                            ivy_objects  [List]                 - Array of ivy branches
+                            profiler     [StageProfiler]        - Collects timings and reports progress (optional)
+                            retime       [Boolean]              - Rewrite the timing of the existing animation
+                            branch_index [BranchIndex]          - Index of the ivy_objects, shared with the jobs
+                                                                  of other leaves of the same ivy (optional)
+        """
+        self.props       = leaves_props
+        self.leaves      = leaves
+        self.ivy_objects = ivy_objects
+        self.profiler    = profiler or StageProfiler()
+        self.retime      = retime
+        self.branch_index = branch_index
+        self.chunk_size  = leaves_props.stream_chunk_size  # 0: all leaves in one step
+        self.leaf_count  = 0
+        self.done        = 0
+        self.cached      = False    # The assignment was read from the cache
+        self.assigned    = False    # Every leaf's branch is known before the first step
+        self.pending     = None     # Assignment still running in the worker processes
+        self.owns_index  = False    # The branch index (and its worker processes) was made by this job
+        self.leaf_clusters = None   # Leaf whose timing every leaf takes, -1 if culled, HIDDEN_CLUSTER if
+                                    # never grown (camera culling)
+
+        self.first_shape_key   = None   # Index of the first shape key created by this job
+        self.created_basis     = False
+        self.created_action    = False
+        self.stored_frames     = None   # Growth attributes before a streaming run wrote its own
+        self.created_modifier  = False
+        self.wrote_attributes  = False
+
+    def start( self ):
+        """ Reads the leaves and indexes the branches (see setup). If that fails, the memory tracing and
+            the worker processes it started are stopped before the error is raised again
+        """
+        try:
+            self.setup()
+        except Exception:
+            self.release()
+            raise
+
+    def setup( self ):
+        profiler = self.profiler
+        leaves   = self.leaves
+
+        if self.chunk_size and self.props.growth_mode == 'SHAPE_KEYS' and not self.retime:
+            raise RuntimeError( "Streaming (stream_chunk_size) only works in the attribute growth mode, "
+                                "every shape key holds all vertices of the leaves mesh" )
+        self.sample_memory()
+
+        with profiler.stage( "leaf geometry" ):
+            # Read the centers and vertices of all leaves in one pass
+            self.leaf_geometry = MeshGeometry( leaves.data )
+            self.leaf_matrix   = leaves.matrix_world.copy()
+            self.leaf_count    = len( self.leaf_geometry )
+            centers            = self.leaf_centers( slice( 0, self.leaf_count ) )
+
+        if self.retime:
+            # Retiming keeps the shape keys, so it keeps the culling they were made with
+            clusters = leaves.get( LEAF_CLUSTERS_PROPERTY )
+            if clusters is not None and len( clusters ) == self.leaf_count:
+                self.leaf_clusters = np.array( clusters, dtype=np.int32 )
+        elif self.props.use_camera_culling:
+            with profiler.stage( "camera culling" ):
+                self.cull_leaves( centers )
+
+        if self.leaf_clusters is not None:
+            self.index_clusters()
+
+        with profiler.stage( "nearest branch assignment" ):
+            if self.branch_index is not None:  # Already read by the shared index
+                branch_index    = self.branch_index
+                branch_geometry = ( branch_index.geometries, branch_index.face_branch, branch_index.face_position )
+            else:
+                branch_geometry = read_branch_geometry( self.ivy_objects )
+            self.geometry_hash = geometry_hash(
+                [ self.leaf_geometry ] + branch_geometry[0],
+                centers, branch_geometry[1],
+                np.array( [ branch["name"] for branch in self.ivy_objects ] ),
+                np.array( [ self.props.use_surface_distance ] ) )
+            if self.chunk_size:
+                self.leaf_geometry.co = None  # Only the centers are needed without shape keys
+
+            cached    = leaves.get( LEAF_BRANCHES_PROPERTY )
+            positions = leaves.get( LEAF_POSITIONS_PROPERTY )
+            if leaves.get( LEAF_BRANCHES_HASH_PROPERTY ) == self.geometry_hash \
+               and cached is not None and len( cached ) == self.leaf_count \
+               and positions is not None and len( positions ) == self.leaf_count:
+                self.leaf_branches  = np.array( cached,    dtype=np.int32   )
+                self.leaf_positions = np.array( positions, dtype=np.float64 )
+                self.cached         = True
+                self.assigned       = True
+            else:
+                # Index all branch faces once, so every leaf lookup is a single query
+                if self.branch_index is None:
+                    self.branch_index = BranchIndex(
+                        self.ivy_objects, self.props.use_surface_distance, branch_geometry,
+                        self.props.assignment_processes )
+                    self.owns_index = True
+                self.leaf_branches  = np.full( self.leaf_count, -1, dtype=np.int32 )
+                self.leaf_positions = np.zeros( self.leaf_count )
+                if self.branch_index.uses_processes and not self.chunk_size:
+                    # All leaves go to the worker processes at once, the steps wait for the result
+                    self.pending_leaves = self.timed_leaves( slice( 0, self.leaf_count ) )
+                    self.pending        = self.branch_index.assign_faces_async( self.leaf_centers( self.pending_leaves ) )
+                    self.assigned       = True
+
+        with profiler.stage( "leaf timing" ):
+            modifier_name = bpy.context.scene.BranchesAnimProperties.modifier_name
+            self.branch_schedule = self.props.get_branch_windows( self.ivy_objects, modifier_name )
+
+            # All random draws are made up front, so the schedule doesn't depend on the chunks
+            self.leaf_draws = draw_leaf_timing(
+                self.leaf_count, self.props.delay_after_branch, self.props.min_growth_length,
+                self.props.max_growth_length, self.props.seed, self.props.delay_distribution )
+
+        # Leaves that were not animated (yet) stay fully grown
+        self.schedule = np.empty( self.leaf_count, dtype=LEAF_SCHEDULE_DTYPE )
+        self.schedule["branch"] = -1
+        self.schedule["start"]  = ALWAYS_GROWN_FRAMES[0]
+        self.schedule["end"]    = ALWAYS_GROWN_FRAMES[1]
+        self.start_frames = self.schedule["start"]
+        self.end_frames   = self.schedule["end"]
+
+        if self.retime:
+            self.check_animated()
+        elif self.props.growth_mode == 'SHAPE_KEYS':
+            with profiler.stage( "shape key creation" ):
+                if leaves.data.shape_keys is None:
+                    leaves.shape_key_add( name="Basis", from_mix=False )  # Create the first, base shapekey
+                    self.created_basis = True
+
+                shape_keys = leaves.data.shape_keys
+                self.created_action  = shape_keys.animation_data is None or shape_keys.animation_data.action is None
+                self.first_shape_key = len( shape_keys.key_blocks )  # New shape keys are added after it
+
+                base_co = np.empty( len( self.leaf_geometry.co ) * 3, dtype=np.float32 )
+                shape_keys.reference_key.data.foreach_get( "co", base_co )
+                self.base_co      = base_co.reshape( -1, 3 )
+                self.co_buffer    = self.base_co.copy()
+                self.collapsed_co = self.props.collapse_leaves( self.leaf_geometry )
+
+        if self.props.growth_mode == 'ATTRIBUTE' and self.chunk_size:
+            self.store_growth_attributes()
+
+        profiler.count( "leaves", self.leaf_count )
+        if self.cached:
+            profiler.count( "cached assignments", self.leaf_count )
+        profiler.progress_begin( self.leaf_count )
+
+    def sample_memory( self ):
+        """ Samples the process memory between the chunks of a streaming run, for its high-water mark """
+        if self.chunk_size:
+            self.profiler.sample_memory()
+
+    def store_growth_attributes( self ):
+        """ Keeps the growth attributes of the last animation, which a streaming run overwrites after every
+            chunk, for rollback()
+        """
+        attributes = self.leaves.data.attributes
+        if all( name in attributes and attributes[name].domain == 'FACE' and attributes[name].data_type == 'FLOAT'
+                for name in ( LEAF_GROW_START_ATTRIBUTE, LEAF_GROW_END_ATTRIBUTE ) ):
+            self.stored_frames = ( read_face_attribute( self.leaves.data, LEAF_GROW_START_ATTRIBUTE ),
+                                   read_face_attribute( self.leaves.data, LEAF_GROW_END_ATTRIBUTE ) )
+        self.created_modifier = LEAF_GROWTH_MODIFIER not in self.leaves.modifiers
+
+    def check_animated( self ):
+        """ Raises a RuntimeError if the leaves were not animated in the current growth mode yet """
+        if self.props.growth_mode == 'ATTRIBUTE':
+            animated = LEAF_GROW_START_ATTRIBUTE in self.leaves.data.attributes
+        else:
+            shape_keys = self.leaves.data.shape_keys
+            animated   = shape_keys is not None and all(
+                leaf_shape_key_name( index ) in shape_keys.key_blocks
+                for index in self.timed_leaves( slice( 0, self.leaf_count ) ).tolist() )
+
+        if not animated:
+            raise RuntimeError( "The leaves of %s are not animated yet, animate them first" % self.leaves.name )
+
+    def leaf_centers( self, leaves ):
+        """ Returns the centers of a slice of the leaves, in global coordinates """
+        return transform_points( self.leaf_geometry.centers[leaves], self.leaf_matrix )
+
+    def cull_leaves( self, centers ):
+        """ function name:  cull_leaves
+            parameters:     centers [(N, 3) float array] - World space centers of all leaves
+            description:    Classifies the leaves with the scene camera over the frame range, and
+                            clusters the ones that are too small to be animated on their own
+        """
+        geometry = self.leaf_geometry
+        radii    = face_radii( geometry.co, geometry.centers, geometry.loop_vertices, geometry.loop_total ) \
+                   * np.abs( self.leaf_matrix.to_scale() ).max()
+
+        view_projections, views, resolution = self.props.camera_view_projections( bpy.context.scene )
+        classes = classify_leaves( centers, radii, view_projections, resolution, self.props.min_pixel_size,
+                                   views, bpy.context.scene.camera.data.type == 'ORTHO' )
+
+        self.leaf_clusters = cluster_leaves( centers, classes, self.props.cluster_size ).astype( np.int32 )
+        self.leaf_clusters[ classes == LEAF_STATIC ] = -1
+
+        self.profiler.count( "culled leaves",    np.count_nonzero( classes == LEAF_STATIC ) )
+        self.profiler.count( "clustered leaves", np.count_nonzero( classes == LEAF_CLUSTERED ) )
+
+    def index_clusters( self ):
+        """ Sorts the leaves by cluster, so the leaves of every cluster can be found without a search """
+        shared = np.flatnonzero( self.leaf_clusters >= 0 )
+        counts = np.bincount( self.leaf_clusters[shared], minlength=self.leaf_count )
+        self.cluster_order = shared[ np.argsort( self.leaf_clusters[shared], kind='stable' ) ]
+        self.cluster_start = np.cumsum( counts ) - counts
+        self.cluster_count = counts
+
+    def timed_leaves( self, leaves ):
+        """ Returns the indices of the leaves of a slice that are timed (and animated) on their own:
+            all of them without camera culling, otherwise the first leaf of every cluster
+        """
+        indices = np.arange( leaves.start, leaves.stop )
+        if self.leaf_clusters is None:
+            return indices
+        return indices[ self.leaf_clusters[leaves] == indices ]
+
+    def cluster_vertices( self, leaf_idx ):
+        """ function name:  cluster_vertices
+            parameters:     leaf_idx [Int] - Index of a timed leaf
+            return value:   The vertices of the leaf and of the other leaves of its cluster
+        """
+        geometry = self.leaf_geometry
+        if self.leaf_clusters is None:
+            return geometry.face_vertices( leaf_idx )
+
+        start   = self.cluster_start[leaf_idx]
+        members = self.cluster_order[ start : start + self.cluster_count[leaf_idx] ]
+        return np.concatenate( [ geometry.face_vertices( member ) for member in members.tolist() ] )
+
+    def share_cluster_timing( self, leaves ):
+        """ function name:  share_cluster_timing
+            parameters:     leaves [Slice] - Leaves whose timing was just computed
+            description:    Culls the timed leaves that are fully grown before the scene's first frame,
+                            and hides the ones that only start growing after its last frame (except when
+                            retiming, which keeps the existing shape keys). Gives the culled leaves the
+                            always grown timing, the hidden leaves the never grown timing, and every other
+                            leaf the timing of the first leaf of its cluster
+        """
+        scene    = bpy.context.scene
+        indices  = np.arange( leaves.start, leaves.stop )
+        clusters = self.leaf_clusters[leaves]  # A view, culling writes through
+        schedule = self.schedule[leaves]
+
+        if not self.retime:
+            settled = ( clusters == indices ) & ( schedule["end"] <= scene.frame_start )
+            hidden  = ( clusters == indices ) & ( schedule["start"] >= scene.frame_end )
+            clusters[settled] = -1
+            clusters[hidden]  = HIDDEN_CLUSTER
+            self.profiler.count( "settled leaves", np.count_nonzero( settled ) )
+            self.profiler.count( "hidden leaves",  np.count_nonzero( hidden ) )
+
+        shared = clusters >= 0
+        clusters[shared] = self.leaf_clusters[ clusters[shared] ]  # Culled with the first leaf of the cluster
+        shared = clusters >= 0
+        hidden = clusters == HIDDEN_CLUSTER
+
+        schedule[shared]            = self.schedule[ clusters[shared] ]
+        schedule["branch"][~shared] = -1
+        schedule["start"][~shared]  = ALWAYS_GROWN_FRAMES[0]
+        schedule["end"][~shared]    = ALWAYS_GROWN_FRAMES[1]
+        schedule["start"][hidden]   = NEVER_GROWN_FRAMES[0]
+        schedule["end"][hidden]     = NEVER_GROWN_FRAMES[1]
+
+    def assign( self, leaves ):
+        """ Finds the closest branch (and closest face's build position) of a slice (or index array)
+            of the leaves
+        """
+        self.store_faces( leaves, self.branch_index.assign_faces( self.leaf_centers( leaves ) ) )
+
+    def store_faces( self, leaves, faces ):
+        """ Stores the branch and build position of the closest face of every leaf """
+        if len( self.branch_index.face_branch ):
+            self.leaf_branches[leaves]  = self.branch_index.face_branch[faces]
+            self.leaf_positions[leaves] = self.branch_index.face_position[faces]
+
+    def collect_assignment( self, timeout=None ):
+        """ function name:  collect_assignment
+            parameters:     timeout [Float] - Seconds to wait for the worker processes (None waits until done)
+            description:    Stores the assignment of the worker processes once they are done
+            return value:   False while they are still searching
+        """
+        if self.pending is None:
+            return True
+        with self.profiler.stage( "nearest branch assignment" ):
+            self.pending.wait( timeout )
+            if not self.pending.ready():
+                return False
+            self.store_faces( self.pending_leaves, NearestPool.result( self.pending ) )
+        self.pending = None
+        return True
+
+    @property
+    def finished( self ):
+        return self.done >= self.leaf_count
+
+    def step( self, count ):
+        """ function name:  step
+            parameters:     count [Int] - Maximum number of leaves to process
+            description:    Finds the closest branch of the next leaves, computes their timing and
+                            (in shape key mode) creates and keyframes their shape keys
+        """
+        profiler = self.profiler
+        leaves   = slice( self.done, min( self.done + count, self.leaf_count ) )
+
+        self.collect_assignment()
+        if not self.assigned:
+            with profiler.stage( "nearest branch assignment" ):
+                self.assign( self.timed_leaves( leaves ) )  # Closest branch of every leaf
+
+        with profiler.stage( "leaf timing" ):
+            schedule    = self.schedule[leaves]  # A view
+            schedule[:] = schedule_leaves(
+                self.branch_schedule, self.leaf_branches[leaves], self.leaf_draws[leaves],
+                self.props.delay_distribution, self.leaf_positions[leaves] )
+
+            # Leaves without a branch to grow from (no branch faces) stay fully grown
+            unassigned = schedule["branch"] < 0
+            schedule["start"][unassigned], schedule["end"][unassigned] = ALWAYS_GROWN_FRAMES
+            if self.leaf_clusters is not None:
+                self.share_cluster_timing( leaves )
+
+        timed = self.timed_leaves( leaves )
+
+        # Retiming keeps the shape keys, finish() rewrites their keyframes (so a rollback has nothing to undo)
+        if self.props.growth_mode == 'SHAPE_KEYS' and not self.retime:
+            with profiler.stage( "shape key creation" ):
+                names = [ self.props.create_shapekey(                      # Create a shapekey for this leaf
+                              self.leaves, index, self.cluster_vertices( index ),
+                              self.base_co, self.collapsed_co, self.co_buffer )
+                          for index in timed.tolist() ]
+
+            with profiler.stage( "keyframing" ):
+                self.props.keyframe_shapekeys(
+                    self.leaves, names, self.start_frames[timed], self.end_frames[timed] )
+
+            profiler.count( "shape keys", len( names ) )
+            profiler.count( "keyframes",  3 * len( names ) )
+
+        elif self.props.growth_mode == 'ATTRIBUTE' and self.chunk_size:
+            # Two values per leaf, so the whole arrays are written at once (leaves still to come are grown)
+            with profiler.stage( "growth attributes" ):
+                self.props.write_growth_attributes( self.leaves, self.start_frames, self.end_frames )
+            self.wrote_attributes = True
+
+        self.done = leaves.stop
+        profiler.progress_update( self.done )
+        self.sample_memory()
+
+    def run( self ):
+        """ Processes all leaves, one chunk at a time when streaming """
+        while not self.finished:
+            self.step( self.chunk_size or self.leaf_count )
+
+    def run_for( self, seconds, chunk_size=64 ):
+        """ function name:  run_for
+            parameters:     seconds    [Float] - Time budget
+                            chunk_size [Int]   - Leaves processed between checks of the time budget
+            description:    Processes chunks of leaves until the time budget is used up or all are done
+        """
+        deadline = time.perf_counter() + seconds
+        if not self.collect_assignment( seconds ):
+            return
+        while not self.finished and time.perf_counter() < deadline:
+            self.step( chunk_size )
+
+    def finish( self ):
+        """ Writes the growth attributes (in attribute mode) or the retimed keyframes, for the leaves
+            processed so far,
+            caches the assignment once every leaf has been assigned (camera culling skips some),
+            stores the clusters of the camera culling, and removes the animation of the other
+            growth mode
+        """
+        if self.finished and not self.cached and self.leaf_clusters is None:
+            self.leaves[LEAF_BRANCHES_PROPERTY]      = self.leaf_branches   # Stored straight from the arrays
+            self.leaves[LEAF_POSITIONS_PROPERTY]     = self.leaf_positions
+            self.leaves[LEAF_BRANCHES_HASH_PROPERTY] = self.geometry_hash
+
+        if self.leaf_clusters is not None:
+            self.leaves[LEAF_CLUSTERS_PROPERTY] = self.leaf_clusters
+        elif not self.retime and LEAF_CLUSTERS_PROPERTY in self.leaves:
+            del self.leaves[LEAF_CLUSTERS_PROPERTY]
+
+        if self.props.growth_mode == 'ATTRIBUTE' and not self.wrote_attributes:
+            with self.profiler.stage( "growth attributes" ):
+                self.props.write_growth_attributes( self.leaves, self.start_frames, self.end_frames )
+        elif self.props.growth_mode == 'SHAPE_KEYS' and not self.retime:
+            self.hide_leaves()
+        elif self.props.growth_mode == 'SHAPE_KEYS':
+            timed = self.timed_leaves( slice( 0, self.done ) )
+            names = [ leaf_shape_key_name( index ) for index in timed.tolist() ]
+            with self.profiler.stage( "keyframing" ):
+                self.props.keyframe_shapekeys(
+                    self.leaves, names, self.start_frames[timed], self.end_frames[timed] )
+            self.profiler.count( "keyframes", 3 * len( names ) )
+
+        # An animation made in the other growth mode would still play on top of this one
+        if not self.retime and self.props.growth_mode == 'ATTRIBUTE':
+            remove_leaf_shape_keys( self.leaves )
+        elif not self.retime:
+            remove_leaf_growth_attributes( self.leaves )
+        self.leaves[LEAF_GROWTH_MODE_PROPERTY] = self.props.growth_mode  # Baking reads the animation back in it
+        self.release()
+
+    def hide_leaves( self ):
+        """ Collapses the leaves processed so far that are never grown (camera culling) in one shape key,
+            left on without keyframes, in place of the one of an earlier animation
+        """
+        key = self.leaves.data.shape_keys.key_blocks.get( HIDDEN_LEAVES_SHAPE_KEY )
+        if key is not None:  # Left by an earlier animation
+            self.leaves.shape_key_remove( key )
+
+        if self.leaf_clusters is None:
+            return
+        hidden = np.flatnonzero( self.leaf_clusters[ :self.done ] == HIDDEN_CLUSTER )
+        if not len( hidden ):
+            return
+
+        geometry    = self.leaf_geometry
+        loop_leaves = np.repeat( np.arange( len( geometry.loop_total ) ), geometry.loop_total )
+        vertices    = geometry.loop_vertices[ np.isin( loop_leaves, hidden ) ]
+
+        key = self.leaves.shape_key_add( name=HIDDEN_LEAVES_SHAPE_KEY, from_mix=False )
+        self.co_buffer[vertices] = self.collapsed_co[vertices]
+        key.data.foreach_set( "co", self.co_buffer.ravel() )
+        self.co_buffer[vertices] = self.base_co[vertices]
+        key.value = 1.0
+
+    def rollback( self ):
+        """ Removes the shape keys (and their F-curves) and the action that this job created, or puts
+            back the growth attributes a streaming run overwrote. A retiming job of shape keys hasn't
+            changed anything before finish()
+        """
+        shape_keys = self.leaves.data.shape_keys
+        names      = [ key_block.name for key_block in shape_keys.key_blocks[ self.first_shape_key: ] ] \
+                     if shape_keys is not None and self.first_shape_key is not None else []
+        if names:
+            action = shape_keys.animation_data.action if shape_keys.animation_data else None
+            if self.created_action and action is not None:
+                bpy.data.actions.remove( action )
+            elif action is not None:
+                remove_fcurves( action, { shape_key_data_path( name ) for name in names } )
+
+            for name in reversed( names ):
+                self.leaves.shape_key_remove( shape_keys.key_blocks[name] )
+
+        if self.created_basis and self.leaves.data.shape_keys is not None:
+            self.leaves.shape_key_clear()
+
+        # The growth attributes a streaming run wrote
+        if self.wrote_attributes and self.stored_frames is not None:
+            write_face_attribute( self.leaves.data, LEAF_GROW_START_ATTRIBUTE, self.stored_frames[0] )
+            write_face_attribute( self.leaves.data, LEAF_GROW_END_ATTRIBUTE,   self.stored_frames[1] )
+            if self.created_modifier:
+                self.leaves.modifiers.remove( self.leaves.modifiers[LEAF_GROWTH_MODIFIER] )
+        elif self.wrote_attributes:
+            remove_leaf_growth_attributes( self.leaves )
+        self.wrote_attributes = False
+
+        self.first_shape_key = None
+        self.release()
+
+    def release( self ):
+        """ Stops the worker processes of the job's own branch index (and a search still running
+            in them), and the progress of the run
+        """
+        self.pending = None
+        if self.owns_index:
+            self.branch_index.close()
+        self.sample_memory()
+        self.profiler.progress_end()
+
+# Button for animating the branches of the plant
+class AnimateBranches( bpy.types.Operator ):
+    """Animate the BranchObject selected above"""
+    bl_idname      = "object.animate_branches"
+    bl_label       = "Animate Branches"
+    bl_description = "Animate the BranchObject selected above"
+    bl_options     = { 'REGISTER', 'UNDO' }
+
+    def execute(self, context):
+        branch_props = context.scene.BranchesAnimProperties
+        with StageProfiler.for_context( context ) as profiler:
+            with profiler.stage( "object preparation" ):
+                object_name = branch_props.prepare_ivy_object( branch_props.modifier_name )
+
+            if object_name == "":
+                print( "No object selected, exiting!" )
+                return {'CANCELLED'}
+
+            with profiler.stage( "branch discovery" ):
+                ivy_objects = branch_props.find_ivy_branches( object_name )
+
+            with profiler.stage( "build timing" ):
+                branch_props.time_branches( ivy_objects )
+
+            profiler.count( "branches", len( ivy_objects ) )
+            profiler.count( "branch faces", sum( branch["facecount"] for branch in ivy_objects ) )
+            profiler.finish( self, context )
+
+            return {'FINISHED'}
+
+# Running a LeafAnimationJob, shared by the leaves' operators. Registered operator classes
+# cannot be subclassed, so the operators inherit from this and from bpy.types.Operator
+class LeafAnimationOperator:
+
+    time_budget = 0.05   # Seconds of work per timer event, keeps the UI responsive
+    retime      = False  # Only rewrite the timing of the existing animation
+
+    def create_job( self, context, profiler ):
+        """ Returns the job animating the leaves (None if there is nothing to animate) """
+        leaves_props = context.scene.LeavesAnimProperties
+        leaves       = context.scene.LeavesObject
+        branches     = bpy.context.scene.BranchObject
+        branchProps  = bpy.context.scene.BranchesAnimProperties
+
+        if branches == "":
+            print( "No object selected, exiting!" )
+            return None
+
+        with profiler.stage( "branch discovery" ):
+            ivy_objects = branchProps.find_ivy_branches( branches )
+
+        if not ivy_objects:
+            print( "No ivy branches found, exiting!" )
+            return None
+
+        return LeafAnimationJob( leaves_props, bpy.data.objects[leaves], ivy_objects, profiler, self.retime )
+
+    def start_job( self, job ):
+        """ Starts the job, returns False (and reports why) if it cannot run """
+        try:
+            job.start()
+        except RuntimeError as error:
+            self.report( {'ERROR'}, str( error ) )
+            return False
+        return True
+
+    def execute(self, context):
+        with StageProfiler.for_context( context ) as profiler:
+            job      = self.create_job( context, profiler )
+            if job is None or not self.start_job( job ):
+                return {'CANCELLED'}
+
+            job.run()
+            job.finish()
+            profiler.finish( self, context )
+
+            return {'FINISHED'}
+
+    def invoke(self, context, event):
+        """ Runs the animation in time-budgeted chunks, Esc cancels it """
+        self.profiler = StageProfiler.for_context( context )
+        self.job      = self.create_job( context, self.profiler )
+        if self.job is None or not self.start_job( self.job ):
+            self.profiler.close()
+            return {'CANCELLED'}
+
+        self.start_time = time.perf_counter()
+
+        window_manager = context.window_manager
+        self.timer = window_manager.event_timer_add( 0.01, window=context.window )
+        window_manager.modal_handler_add( self )
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        job = self.job
+
+        if event.type == 'ESC':
+            if context.scene.LeavesAnimProperties.keep_partial_results:
+                job.finish()
+                self.report( {'WARNING'}, "Cancelled, kept the animation of %d of %d leaves"
+                                          % ( job.done, job.leaf_count ) )
+                self.cleanup( context )
+                return {'FINISHED'}  # The partial animation stays, and gets an undo step
+
+            job.rollback()
+            self.report( {'WARNING'}, "Cancelled, the leaves were not animated" )
+            self.cleanup( context )
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER' or event.timer != self.timer:
+            return {'PASS_THROUGH'}
+
+        try:
+            job.run_for( self.time_budget )
+        except Exception as error:
+            # Nothing is left half animated, and the timer doesn't keep calling a broken job
+            job.rollback()
+            self.cleanup( context )
+            self.report( {'ERROR'}, "The leaves were not animated: %s" % error )
+            return {'CANCELLED'}
+
+        if job.finished:
+            job.finish()
+            self.cleanup( context )
+            self.profiler.finish( self, context )
+            return {'FINISHED'}
+
+        if job.pending is not None:
+            context.workspace.status_text_set(
+                "Finding the nearest branch of %d leaves in %d processes (Esc to cancel)"
+                % ( len( job.pending_leaves ), job.branch_index.processes ) )
+            self.start_time = time.perf_counter()  # The ETA only measures the animation
+            return {'RUNNING_MODAL'}
+
+        elapsed = time.perf_counter() - self.start_time
+        eta     = elapsed * ( job.leaf_count - job.done ) / max( job.done, 1 )
+        context.workspace.status_text_set(
+            "Animating leaves: %d / %d, about %.0fs left (Esc to cancel)" % ( job.done, job.leaf_count, eta ) )
+        return {'RUNNING_MODAL'}
+
+    def cleanup( self, context ):
+        context.window_manager.event_timer_remove( self.timer )
+        context.workspace.status_text_set( None )
+        self.profiler.close()
+
+# Button for animating the branches of the plant
+class AnimateLeaves( LeafAnimationOperator, bpy.types.Operator ):
+    """Animate the LeavesObject selected above"""
+    bl_idname = "object.animate_leaves"
+    bl_label  = "Animate Leaves"
+    bl_description = "Animate the LeavesObject selected above"
+    bl_options = { 'REGISTER', 'UNDO' }
+
+# Button for baking the animated ivy into a growth cache
+class BakeGrowth( bpy.types.Operator ):
+    """Bake the animated ivy to a growth cache file, played back by a single mesh object"""
+    bl_idname      = "object.bake_growth"
+    bl_label       = "Bake Growth"
+    bl_description = "Save the appear frame of every branch face and the growth of every leaf to a " \
+                     "cache file, and replace the animated objects with a single playback object"
+    bl_options     = { 'REGISTER', 'UNDO' }
+
+    def execute(self, context):
+        scene      = context.scene
+        bake_props = scene.BakeProperties
+        with StageProfiler.for_context( context ) as profiler:
+            if scene.BranchObject == "":
+                print( "No object selected, exiting!" )
+                return {'CANCELLED'}
+
+            with profiler.stage( "branch discovery" ):
+                ivy_objects = scene.BranchesAnimProperties.find_ivy_branches( scene.BranchObject )
+
+            if not ivy_objects:
+                print( "No ivy branches found, exiting!" )
+                return {'CANCELLED'}
+
+            leaves = bpy.data.objects.get( scene.LeavesObject ) if scene.LeavesObject else None
+            try:
+                cache = bake_props.bake_growth( ivy_objects, leaves, profiler )
+            except RuntimeError as error:
+                self.report( {'ERROR'}, str( error ) )
+                return {'CANCELLED'}
+
+            sources = [ bpy.data.objects[name] for name in group_branches_by_object( ivy_objects ) ]
+            if leaves is not None:
+                sources.append( leaves )
+
+            with profiler.stage( "playback object" ):
+                bake_props.create_playback_object( scene.BranchObject + "_baked", cache, sources )
+
+            first_frame, last_frame = cache.frame_range
+            self.report( {'INFO'}, "Baked frames %d to %d to %s" % ( first_frame, last_frame, bake_props.bake_filepath ) )
+            profiler.finish( self, context )
+
+            return {'FINISHED'}
+
+# Buttons for the list of ivies animated together
+class AddIvyPair( bpy.types.Operator ):
+    """Add the BranchObject and LeavesObject selected above to the ivies animated together"""
+    bl_idname      = "object.add_ivy_pair"
+    bl_label       = "Add Ivy"
+    bl_description = "Add the BranchObject and LeavesObject selected above to the ivies animated together"
+    bl_options     = { 'REGISTER', 'UNDO' }
+
+    def execute(self, context):
+        scene = context.scene
+        pair  = scene.IvyPairs.add()
+        pair.branch_object  = scene.BranchObject
+        pair.leaves_object  = scene.LeavesObject
+        scene.IvyPairsIndex = len( scene.IvyPairs ) - 1
+        return {'FINISHED'}
+
+class RemoveIvyPair( bpy.types.Operator ):
+    """Remove the active ivy from the ivies animated together"""
+    bl_idname      = "object.remove_ivy_pair"
+    bl_label       = "Remove Ivy"
+    bl_description = "Remove the active ivy from the ivies animated together"
+    bl_options     = { 'REGISTER', 'UNDO' }
+
+    def execute(self, context):
+        scene = context.scene
+        if not 0 <= scene.IvyPairsIndex < len( scene.IvyPairs ):
+            return {'CANCELLED'}
+
+        scene.IvyPairs.remove( scene.IvyPairsIndex )
+        scene.IvyPairsIndex = min( scene.IvyPairsIndex, len( scene.IvyPairs ) - 1 )
+        return {'FINISHED'}
+
+class AnimateIvyPairs( bpy.types.Operator ):
+    """Animate the branches and leaves of every ivy in the list"""
+    bl_idname      = "object.animate_ivy_pairs"
+    bl_label       = "Animate All Ivies"
+    bl_description = "Animate the branches and leaves of every enabled ivy in the list, each shifted by " \
+                     "its frame offset"
+    bl_options     = { 'REGISTER', 'UNDO' }
+
+    def group_pairs( self, pairs ):
+        """ function name:  group_pairs
+            parameters:     pairs [List] - The enabled pairs of the list
+            description:    Every ivy is prepared, timed and indexed once, and every leaves object is
+                            animated once, so an ivy listed with two frame offsets, or leaves listed with
+                            two ivies, are rejected (a RuntimeError) instead of silently using the first
+            return value:   Dictionaries with the first pair of every ivy and of every leaves object
+        """
+        ivy_pairs  = {}
+        leaf_pairs = {}
+        for pair in pairs:
+            ivy_pair = ivy_pairs.setdefault( pair.branch_object, pair )
+            if ivy_pair.frame_offset != pair.frame_offset:
+                raise RuntimeError( "%s is in the list with frame offsets %+d and %+d, keep one of them"
+                                    % ( pair.branch_object, ivy_pair.frame_offset, pair.frame_offset ) )
+
+            if pair.leaves_object in bpy.data.objects:
+                leaf_pair = leaf_pairs.setdefault( pair.leaves_object, pair )
+                if leaf_pair.branch_object != pair.branch_object:
+                    raise RuntimeError( "%s is in the list with %s and with %s, keep one of them"
+                                        % ( pair.leaves_object, leaf_pair.branch_object, pair.branch_object ) )
+        return ivy_pairs, leaf_pairs
+
+    def execute(self, context):
+        scene        = context.scene
+        branch_props = scene.BranchesAnimProperties
+        leaves_props = scene.LeavesAnimProperties
+        with StageProfiler.for_context( context ) as profiler:
+            # Pairs whose objects were deleted or renamed are reported, not silently dropped
+            pairs = []
+            for pair in scene.IvyPairs:
+                if not pair.enabled:
+                    continue
+                if pair.branch_object not in bpy.data.objects:
+                    self.report( {'WARNING'}, "Skipped the ivy %r (leaves %r), there is no object with that name"
+                                              % ( pair.branch_object, pair.leaves_object ) )
+                    continue
+                if pair.leaves_object and pair.leaves_object not in bpy.data.objects:
+                    self.report( {'WARNING'}, "Only the branches of %r are animated, there is no leaves object %r"
+                                              % ( pair.branch_object, pair.leaves_object ) )
+                pairs.append( pair )
+            if not pairs:
+                self.report( {'WARNING'}, "No ivy to animate, add one to the list first" )
+                return {'CANCELLED'}
+
+            try:
+                ivy_pairs, leaf_pairs = self.group_pairs( pairs )
+            except RuntimeError as error:
+                self.report( {'ERROR'}, str( error ) )
+                return {'CANCELLED'}
+
+            with profiler.stage( "object preparation" ):
+                curves = [ name for name in ivy_pairs if bpy.data.objects[name].type == 'CURVE' ]
+                meshes = {}
+                if branch_props.branch_mode == 'SINGLE' or branch_props.preparation_method == 'DATA':
+                    meshes = branch_props.evaluate_ivy_meshes( curves )
+                try:
+                    for name in curves:
+                        branch_props.prepare_ivy_object( branch_props.modifier_name, name, meshes.pop( name, None ) )
+                finally:
+                    for mesh in meshes.values():  # Not used up, an ivy before them failed
+                        bpy.data.meshes.remove( mesh )
+
+            with profiler.stage( "branch discovery" ):
+                ivy_objects = { name : branch_props.find_ivy_branches( name ) for name in ivy_pairs }
+
+            with profiler.stage( "build timing" ):
+                for name, pair in ivy_pairs.items():
+                    branch_props.time_branches( ivy_objects[name], pair.frame_offset )
+
+            # Leaves are matched with the branches of their own ivy only
+            leaf_pairs = { name : pair for name, pair in leaf_pairs.items() if ivy_objects[ pair.branch_object ] }
+
+            with profiler.stage( "branch index" ):
+                branch_indices = {
+                    name : BranchIndex( ivy_objects[name], leaves_props.use_surface_distance,
+                                        processes=leaves_props.assignment_processes )
+                    for name in { pair.branch_object for pair in leaf_pairs.values() } }
+
+            # The branches are already animated, so leaves that can't be animated don't stop the others,
+            # and the result is kept (and can be undone) as a whole
+            failed = []
+            try:
+                for leaves_name, pair in leaf_pairs.items():
+                    job = LeafAnimationJob( leaves_props, bpy.data.objects[leaves_name], ivy_objects[ pair.branch_object ],
+                                            profiler, branch_index=branch_indices[ pair.branch_object ] )
+                    try:
+                        job.start()
+                    except RuntimeError as error:
+                        failed.append( str( error ) )
+                        continue
+                    job.run()
+                    job.finish()
+            finally:
+                for branch_index in branch_indices.values():
+                    branch_index.close()  # Stops their worker processes
+
+            with profiler.stage( "depsgraph update" ):
+                context.view_layer.update()  # Once, after every ivy was animated
+
+            profiler.count( "ivies", len( ivy_pairs ) )
+            profiler.finish( self, context )
+
+            for error in failed:
+                self.report( {'WARNING'}, error )
+            if failed:
+                self.report( {'WARNING'}, "Animated %d of %d leaves objects, the others were not changed"
+                                          % ( len( leaf_pairs ) - len( failed ), len( leaf_pairs ) ) )
+
+            return {'FINISHED'}
+
+# Button for re-timing the animated leaves
+class RetimeLeaves( LeafAnimationOperator, bpy.types.Operator ):
+    """Rewrite the timing of the animated leaves, after changing the leaves animation parameters"""
+    bl_idname = "object.retime_leaves"
+    bl_label  = "Retime Leaves"
+    bl_description = "Rewrite the timing of the animated leaves (their shape keys' keyframes or " \
+                     "growth attributes), reusing the cached nearest branch of every leaf"
+    bl_options = { 'REGISTER', 'UNDO' }
+
+    retime = True
+
+class BranchesAnimProperties( bpy.types.PropertyGroup ):
+
+    frame_start : bpy.props.IntProperty(  # When to start animating
+        name="frame_start",               # the branches
+        description="Growth animation's start point (frame)",
+        default=1
+        )
+    faces_per_frame : bpy.props.IntProperty( # Controls the speed of the
+        name="faces_per_frame",              # animation
+        description="Speed of the animation (higher values = faster)",
+        default=4
+        )
+    delay_branches : bpy.props.IntProperty( # Frames to wait between
+        name="delay_branches",              # branches
+        description="Number of frames to wait between branch builds",
+        default=4
+        )
+    initial_delay : bpy.props.IntProperty( # Frames to wait between
+        name="initial_delay",              # before starting with branch no. 2
+        description="Number of frames to wait before animating 2nd branch (with use_initial_delay)",
+        default=15
+        )
+    use_initial_delay : bpy.props.BoolProperty(  # Older scenes wait delay_branches
+        name="use_initial_delay",                 # before the 2nd branch too
+        description="Wait initial_delay frames before the 2nd branch instead of delay_branches",
+        default=False
+        )
+
+    modifier_name : bpy.props.StringProperty(
+        name="modifier_name", default="GROW" )
+
+    preparation_method : bpy.props.EnumProperty(  # How the ivy is converted, sorted and split
+        name="preparation_method",
+        description="How to convert, sort and split the ivy object into branches",
+        items=[
+            ('DATA',      "Data",      "Work directly on the mesh data (fast, does not need a 3D View)"),
+            ('OPERATORS', "Operators", "Use the convert, sort and separate operators in edit mode"),
+            ],
+        default='DATA'
+        )
+
+    branch_mode : bpy.props.EnumProperty(  # How the branches are animated
+        name="branch_mode",
+        description="How to animate the growth of the branches",
+        items=[
+            ('SPLIT',  "Split",       "One object with a build modifier per loose part of the ivy"),
+            ('SINGLE', "Single Mesh", "Keep the ivy as one mesh with a per face appear frame, revealed by "
+                                      "a single geometry nodes modifier (always prepared on mesh data)"),
+            ],
+        default='SPLIT'
+        )
+
+    def find_root_point( self, obj ):
+        """ function name:  find_root_point
+            parameters:     obj [Curve obj] - The ivy curve object
+            description:    Finds the point the ivy grows from: the first point of the ivy curve, or
+                            the lowest point for sapling trees
+            return value:   The root point's coordinates (in object space)
+        """
+
+        s = obj.data.splines[0]
+        if s.type == 'BEZIER': # Sapling Tree
+            # Since a sapling curve's first spline is not necessarily the trunk
+            # I'm going to find the lowest point and use it as the base
+            coos = [ p.co for s in obj.data.splines for p in s.bezier_points ]
+
+            first_curve_point = coos[0]
+            minZ              = first_curve_point.z
+            for co in coos:
+                if co.z < minZ:
+                    minZ              = co.z
+                    first_curve_point = co
+        else:
+            first_curve_point = obj.data.splines[0].points[0].co  # 1st pt Coord
+
+        # I'm creating a new vector since the point natively comes with
+        # 4 arguments instead of just xyz
+        return mathutils.Vector( [
+            first_curve_point.x,
+            first_curve_point.y,
+            first_curve_point.z ] )
+
+    def prepare_ivy_object( self, modifier_name, ivy_obj_name=None, mesh=None ):
+        """ function name:  prepare_ivy_object
+            parameters:     modifier_name [String] - Name of the build modifier to add
+                            ivy_obj_name  [String] - The ivy object (default: the selected BranchObject)
+                            mesh          [Mesh]   - The ivy already converted to a mesh (optional, see
+                                                     evaluate_ivy_meshes)
+            description:    converts the active ivy object (which must be selected) form a curve into a mesh,
+                            sorts all faces according to the distance from the first point of the ivy curve
+                            adds a standard build modifier to this object
+                            and eventually splits according to loose parts
+        """
+
+        if ivy_obj_name is None:
+            ivy_obj_name = bpy.context.scene.BranchObject  # Get selected object's name
+
+        if ivy_obj_name == "":
+            return ""
+
+        obj        = bpy.data.objects[ivy_obj_name]
+        root_point = self.find_root_point( obj )
+
+        if self.branch_mode == 'SINGLE':
+            self.prepare_ivy_data( obj, root_point, modifier_name, split=False, mesh=mesh )
+            return ivy_obj_name
+
+        if self.preparation_method == 'DATA':
+            self.prepare_ivy_data( obj, root_point, modifier_name, mesh=mesh )
+            return ivy_obj_name
+
+        # Set the 3D cursor position to the first curve point
+        bpy.context.scene.cursor.location = obj.matrix_world @ root_point
+
+        # Select only this object, the operators work on all selected objects
+        for selected_obj in bpy.context.selected_objects:
+            selected_obj.select_set(False)
+        obj.select_set(True)
+        bpy.context.view_layer.objects.active = obj
+
+        bpy.ops.object.convert(target='MESH')       # object to mesh
+        bpy.ops.object.mode_set(mode='EDIT' )       # Go to edit mode
+        bpy.ops.mesh.select_mode(                   # Goto face selection mode
+            use_extend=False,
+            use_expand=False,
+            type='FACE')
+        bpy.ops.mesh.select_all(action='SELECT')    # Select all faces (only selected faces are sorted)
+        bpy.ops.mesh.sort_elements(                 # Sort faces by 3D cursor distance
+            type='CURSOR_DISTANCE',
+            elements={'FACE'})
+        obj.modifiers.new( modifier_name, 'BUILD' ) # Add a Build modifier
+        existing = set( bpy.data.objects.keys() )
+        bpy.ops.mesh.separate(type='LOOSE')         # split by loose parts
+        bpy.ops.object.mode_set(mode='OBJECT')              # Go to object mode
+
+        # The first part keeps the original name, the others are new objects
+        parts = sorted( ( part for part in bpy.data.objects if part.name not in existing ),
+                        key=lambda part: part.name )
+        register_branches( obj, [ obj ] + parts )
+
+        return ivy_obj_name
+
+    def evaluate_ivy_meshes( self, names ):
+        """ function name:  evaluate_ivy_meshes
+            parameters:     names [List] - Names of ivy curve objects
+            description:    Converts the evaluated curves to meshes after a single depsgraph evaluation,
+                            before any of them is changed, so preparing many ivies does not evaluate the
+                            scene again for every one
+            return value:   Dictionary with the new mesh of every name
+        """
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        return { name : bpy.data.meshes.new_from_object( bpy.data.objects[name].evaluated_get( depsgraph ) )
+                 for name in names }
+
+    def prepare_ivy_data( self, obj, root_point, modifier_name, split=True, mesh=None ):
+        """ function name:  prepare_ivy_data
+            parameters:     obj           [Curve obj] - The ivy curve object
+                            root_point    [Vector]    - The point the ivy grows from (object space)
+                            modifier_name [String]    - Name of the build modifier to add
+                            split         [Boolean]   - Split the loose parts into separate objects. Otherwise
+                                                        the ivy stays one mesh, and the loose part of every
+                                                        face is stored in a face attribute
+                            mesh          [Mesh]      - The evaluated curve as a mesh, if it was already
+                                                        converted (it is used up)
+            description:    Same as the operators in prepare_ivy_object, but done directly on mesh data:
+                            the evaluated curve is turned into a mesh, its faces are sorted by the distance
+                            of their centers from the root point, the loose parts are found with a union-find
+                            over the edges, and every part is created as a new mesh object in bulk.
+                            The parts get the same names as with the separate operator, and the faces
+                            of every part stay sorted by distance from the root point.
+                            The curve object itself is kept, hidden and renamed with a "_source" suffix,
+                            so its modifiers, custom properties and animation are not lost.
+                            Nothing is selected, no mode is changed and the 3D cursor is left untouched
+            return value:   List with the new branch objects
+        """
+
+        if mesh is None:
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            mesh      = bpy.data.meshes.new_from_object( obj.evaluated_get( depsgraph ) )
+        geometry  = MeshGeometry( mesh )
+
+        edges = np.empty( len( mesh.edges ) * 2, dtype=np.int32 )
+        mesh.edges.foreach_get( "vertices", edges )
+        edges = edges.reshape( -1, 2 )
+
+        face_order = sort_faces_by_distance( geometry.centers, root_point )
+        vert_parts = find_loose_parts( len( geometry.co ), edges )
+        face_parts = vert_parts[ geometry.loop_vertices[ geometry.loop_start ] ]
+        edge_parts = vert_parts[ edges[:, 0] ]
+
+        name        = obj.name
+        data_name   = obj.data.name
+        collections = list( obj.users_collection )
+        parent      = obj.parent
+        matrix      = obj.matrix_world.copy()
+        split_data  = read_split_data( mesh )
+
+        # The mesh objects take the curve object's place, the curve is kept out of sight
+        obj.name          = name + "_source"
+        obj.hide_viewport = True
+        obj.hide_render   = True
+
+        if not split:
+            ivy_mesh = split_mesh( mesh, geometry, edges, face_order,
+                                   np.arange( len( geometry.co ) ), np.arange( len( edges ) ), data_name,
+                                   split_data )
+            write_face_attribute( ivy_mesh, BRANCH_PART_ATTRIBUTE, face_parts[ face_order ], 'INT' )
+
+            ivy_obj = bpy.data.objects.new( name, ivy_mesh )
+            for collection in collections:
+                collection.objects.link( ivy_obj )
+            ivy_obj.parent       = parent
+            ivy_obj.matrix_world = matrix
+
+            bpy.data.meshes.remove( mesh )
+            return [ ivy_obj ]
+
+        # The first part keeps the original name and the others get numbered
+        # names in the order of their first vertex, like the separate operator does
+        part_count  = vert_parts.max() + 1 if len( vert_parts ) else 0
+        branch_objs = []
+
+        # The faces (sorted), vertices and edges of every part, grouped with one sort each
+        part_faces = split_by_part( face_parts, part_count, face_order )
+        part_verts = split_by_part( vert_parts, part_count )
+        part_edges = split_by_part( edge_parts, part_count )
+
+        for part in range( part_count ):
+            part_mesh = split_mesh( mesh, geometry, edges, part_faces[part], part_verts[part],
+                                    part_edges[part], data_name, split_data )
+
+            branch_obj = bpy.data.objects.new( name, part_mesh )
+            for collection in collections:
+                collection.objects.link( branch_obj )
+            branch_obj.parent       = parent
+            branch_obj.matrix_world = matrix
+            branch_obj.modifiers.new( modifier_name, 'BUILD' ) # Add a Build modifier
+            branch_objs.append( branch_obj )
+
+        bpy.data.meshes.remove( mesh )
+
+        if branch_objs:
+            register_branches( branch_objs[0], branch_objs )
+        return branch_objs
+
+    def find_ivy_branches( self, base_name ):
+        """ function name:  find_ivy_branches
+            description:    reads the branches from the registry that prepare_ivy_object stored on the
+                            first branch. An ivy that was kept as a single mesh has one entry per loose part,
+                            which also includes the index of the part. Ivies prepared without a registry
+                            (or whose branches were renamed or deleted since) fall back to browsing all
+                            objects and filtering out those who have the base_name in their names
+            return value:   an array (ivy_objects) which contains a list of dictionaries with the name and facecount of each ivy object
+        """
+
+        base_obj = bpy.data.objects.get( base_name )
+        if base_obj is not None and base_obj.type == 'MESH' and \
+           BRANCH_PART_ATTRIBUTE in base_obj.data.attributes:
+            face_parts = read_face_attribute( base_obj.data, BRANCH_PART_ATTRIBUTE, 'INT' )
+            return [ { "name" : base_name, "facecount" : int( face_count ), "part" : part }
+                     for part, face_count in enumerate( np.bincount( face_parts ) ) ]
+
+        registered = registered_branches( base_obj )
+        if registered is not None:
+            return registered
+
+        ivy_objects = []
+        for current_obj in bpy.data.objects:                 # browse all objects and filter out ivy branches
+            if base_name in current_obj.name and current_obj.type == 'MESH':  # (not the kept source curve)
+                current_obj.data.update()                    # calculate face data so that...
+                face_count = len(current_obj.data.polygons) # we can obtain the total number of faces
+                ivy_objects.append( {                        # add ivy object to list:
+                    "name" : current_obj.name,               #   include name
+                    "facecount" : face_count } )             #   and face count
+
+        return ivy_objects
+
+    def find_biggest_branch(self, ivy_objects, faces_per_frame):
+        biggest_obj = ""
+        most_faces  = 0
+
+        # Find the biggest object (highest face count)
+        for obj in ivy_objects:
+            if obj["facecount"] > most_faces:   # if this object's facecount is larger than the previous highscore,
+                most_faces  = obj["facecount"]  # then make this facecount one the new max
+                biggest_obj = obj["name"]       # and update the biggest object's name
+
+        # set base build animation length according to the biggest object's size
+        base_build_length = int( most_faces / faces_per_frame )
+        return biggest_obj, most_faces, base_build_length
+
+    def time_branches( self, ivy_objects, frame_offset=0 ):
+        """ function name:  time_branches
+            parameters:     ivy_objects  [List] - Array of ivy branches
+                            frame_offset [Int]  - Frames to shift the whole ivy's growth by
+            description:    Times the build of all branches with the branch animation parameters
+            return value:   BRANCH_SCHEDULE_DTYPE array with the build window of every branch
+        """
+        ( biggest_obj, most_faces, base_build_length ) = self.find_biggest_branch(
+                ivy_objects, self.faces_per_frame )
+
+        return self.set_build_timing(
+            ivy_objects,
+            self.frame_start + frame_offset,
+            self.initial_delay if self.use_initial_delay else self.delay_branches,
+            self.delay_branches,
+            most_faces,
+            base_build_length)
+
+    def set_build_timing( self, ivy_objects, build_start_frame, build_interval, wait_between_branches, most_faces, base_build_length):
+        """ function name:  set_build_timing
+            description:    Computes the build window of all branches in one pass and applies it to their
+                            build modifiers (or appear frames, for an ivy kept as a single mesh)
+            return value:   BRANCH_SCHEDULE_DTYPE array with the build window of every branch
+        """
+        modifier_name = bpy.context.scene.BranchesAnimProperties.modifier_name
+
+        schedule = np.empty( len( ivy_objects ), dtype=BRANCH_SCHEDULE_DTYPE )
+        schedule["start"], schedule["duration"] = compute_build_timing(
+            [ obj["facecount"] for obj in ivy_objects ],
+            build_start_frame, build_interval, wait_between_branches, most_faces, base_build_length )
+
+        single_mesh_parts = {}
+
+        # set animation length and start frames to all objects in list
+        for obj, ( start, duration ) in zip( ivy_objects, schedule.tolist() ):
+            if "part" in obj:  # Loose part of an ivy kept as a single mesh
+                single_mesh_parts.setdefault( obj["name"], [] ).append( ( obj["part"], start, duration ) )
+                continue
+
+            modifier = bpy.data.objects[ obj["name"] ].modifiers[modifier_name]
+            modifier.frame_start    = start
+            modifier.frame_duration = duration
+
+        for name, parts in single_mesh_parts.items():
+            self.set_appear_frames( bpy.data.objects[name], parts )
+
+        return schedule
+
+    def set_appear_frames( self, ivy_obj, parts ):
+        """ function name:  set_appear_frames
+            parameters:     ivy_obj [Mesh obj] - An ivy kept as a single mesh
+                            parts   [List]     - ( part index, build start, build duration ) of the loose parts
+            description:    Stores the frame where every face of the ivy appears in a face attribute, with
+                            the same timing the build modifier of a split branch would give it, and adds a
+                            single geometry nodes modifier that reveals the faces by frame
+        """
+        part_count = max( part for part, start, duration in parts ) + 1
+        starts     = np.zeros( part_count )
+        durations  = np.zeros( part_count )
+        for part, start, duration in parts:
+            starts[part]    = start
+            durations[part] = duration
+
+        face_parts = read_face_attribute( ivy_obj.data, BRANCH_PART_ATTRIBUTE, 'INT' )
+        write_face_attribute( ivy_obj.data, BRANCH_APPEAR_ATTRIBUTE,
+                              compute_appear_frames( face_parts, starts, durations ) )
+
+        # Keep the build windows, so the leaves can be timed after their closest part
+        ivy_obj[BRANCH_STARTS_PROPERTY]    = starts.tolist()
+        ivy_obj[BRANCH_DURATIONS_PROPERTY] = durations.tolist()
+
+        modifier = ivy_obj.modifiers.get( BRANCH_GROWTH_NODE_GROUP )
+        if modifier is None:
+            modifier = ivy_obj.modifiers.new( BRANCH_GROWTH_NODE_GROUP, 'NODES' )
+        modifier.node_group = ensure_branch_growth_node_group()
+
+class LeavesAnimProperties( bpy.types.PropertyGroup ):
+
+    # Leaf Animation Properties
+    delay_after_branch : bpy.props.IntProperty(  # No. of frames to wait after
+        name="delay_after_branch",               # closest branch finished
+        description="Frames to wait before animating leaf after closest branch finished animating",
+        default=10
+        )
+    max_growth_length : bpy.props.IntProperty(  # Maximum growth animation length
+        name="max_growth_length",
+        description="Maximum length for the growth animation of a leaf",
+        default=25
+        )
+    min_growth_length : bpy.props.IntProperty(  # Minimum growth animation length
+        name="min_growth_length",
+        description="Minimum length for the growth animation of a leaf",
+        default=10
+        )
+
+    use_surface_distance : bpy.props.BoolProperty(  # Match leaves to the branch surface
+        name="use_surface_distance",                  # instead of the face centers
+        description="Find the nearest branch by exact surface distance instead of face center distance",
+        default=False
+        )
+
+    growth_mode : bpy.props.EnumProperty(  # How the leaves' growth is stored and evaluated
+        name="growth_mode",
+        description="How to store and evaluate the growth of the leaves (animating the leaves removes "
+                    "the animation of the other mode)",
+        items=[
+            ('SHAPE_KEYS', "Shape Keys", "One animated shape key per leaf"),
+            ('ATTRIBUTE',  "Attribute",  "Store each leaf's growth frames as face attributes, "
+                                         "evaluated by a single geometry nodes modifier"),
+            ],
+        default='SHAPE_KEYS'
+        )
+    seed : bpy.props.IntProperty(  # The same seed always gives the same animation
+        name="seed",
+        description="Seed of the leaves' random delays and growth lengths",
+        default=0,
+        min=0
+        )
+    delay_distribution : bpy.props.EnumProperty(  # How the leaves' delays are drawn
+        name="delay_distribution",
+        description="How the delay of every leaf after its branch is drawn",
+        items=[
+            ('UNIFORM',  "Uniform",  "Any delay up to delay_after_branch is equally likely"),
+            ('NORMAL',   "Normal",   "Delays cluster around half of delay_after_branch"),
+            ('DISTANCE', "Distance", "Leaves wait for the face of their branch closest to them instead "
+                                     "of the whole branch, so they follow the branch as it grows"),
+            ],
+        default='UNIFORM'
+        )
+    assignment_processes : bpy.props.IntProperty(  # Parallel nearest branch search
+        name="assignment_processes",
+        description="Worker processes that find the nearest branch of the leaves (1 searches in "
+                    "Blender's own process, with its KD-tree). Starting the workers takes seconds, so "
+                    "only very large ivies on many cores are faster. Not used with use_surface_distance",
+        default=1,
+        min=1
+        )
+    stream_chunk_size : bpy.props.IntProperty(  # Animation of huge leaf meshes in chunks
+        name="stream_chunk_size",
+        description="Animate the leaves in chunks of this many leaves, writing the growth attributes after "
+                    "every chunk so the temporary data stays small, and report the process memory's "
+                    "high-water mark, sampled after every chunk (0 animates all leaves at once). Only in the "
+                    "attribute growth mode, every shape key stores the whole leaves mesh",
+        default=0,
+        min=0
+        )
+    use_camera_culling : bpy.props.BoolProperty(  # Only animate what the camera can see
+        name="use_camera_culling",
+        description="Leave the leaves the scene camera never sees during the frame range (or that are grown "
+                    "before it starts) fully grown, and give tiny distant leaves the timing of their cluster. "
+                    "Retiming keeps the culling of the last animation",
+        default=False
+        )
+    min_pixel_size : bpy.props.FloatProperty(  # Smaller leaves share their timing
+        name="min_pixel_size",
+        description="Leaves that never get this many pixels across in the render are animated in clusters",
+        default=2.0,
+        min=0.0
+        )
+    cluster_size : bpy.props.IntProperty(  # Leaves per timing cluster
+        name="cluster_size",
+        description="Largest number of neighbouring tiny leaves that share one timing (and one shape key)",
+        default=16,
+        min=1
+        )
+    culling_frame_step : bpy.props.IntProperty(  # Camera samples of an animated camera
+        name="culling_frame_step",
+        description="Frames between the camera positions that are checked, when the camera moves",
+        default=10,
+        min=1
+        )
+    keep_partial_results : bpy.props.BoolProperty(  # What Esc does to an interactive run
+        name="keep_partial_results",
+        description="When the leaves' animation is cancelled with Esc, keep the leaves animated so far "
+                    "(the others stay fully grown) instead of removing them",
+        default=False
+        )
+
+    def find_nearest_branch( self, branch_index, glob_co ):
+        """ function name:  find_nearest_branch
+            parameters:     branch_index [BranchIndex] - Spatial index over all ivy branches
+                            global_co [Vector] - the coordinates of the object we want to
+                                                 match with the nearest branch
+            description:    Finds the nearest branch to the coordinates it gets as a parameter
+            return value:   The closest ivy branch (dictionary with name and facecount)
+        """
+        return branch_index.find_nearest( glob_co )
+
+    def get_branch_windows( self, ivy_objects, modifier_name ):
+        """ function name:  get_branch_windows
+            parameters:     ivy_objects   [List]   - Array of ivy branches
+                            modifier_name [String] - Name of the branches' build modifier
+            description:    Reads the build modifier's timing of every branch once (or the stored build
+                            window, for the loose parts of an ivy kept as a single mesh)
+            return value:   BRANCH_SCHEDULE_DTYPE array with the start frame and duration of every
+                            branch's build
+        """
+        windows = np.empty( len( ivy_objects ), dtype=BRANCH_SCHEDULE_DTYPE )
+
+        for branch_idx, branch in enumerate( ivy_objects ):
+            branch_obj = bpy.data.objects[ branch["name"] ]
+            if "part" in branch:
+                windows[branch_idx] = ( branch_obj[BRANCH_STARTS_PROPERTY][ branch["part"] ],
+                                        branch_obj[BRANCH_DURATIONS_PROPERTY][ branch["part"] ] )
+            else:
+                modifier = branch_obj.modifiers[modifier_name]
+                windows[branch_idx] = ( modifier.frame_start, modifier.frame_duration )
+
+        return windows
+
+    def camera_view_projections( self, scene ):
+        """ function name:  camera_view_projections
+            parameters:     scene [Scene] - The scene whose camera and frame range are used
+            description:    Reads the scene camera's view at every culling_frame_step frames of the frame
+                            range (and at its last frame), or only once if neither the camera nor its
+                            parents are animated or constrained. The current frame is restored afterwards
+            return value:   (C, 4, 4) arrays of projection times inverse camera matrices and of the
+                            inverse camera matrices, and the render resolution in pixels
+        """
+        camera = scene.camera
+        if camera is None:
+            raise RuntimeError( "The scene has no camera to cull the leaves with" )
+
+        render     = scene.render
+        resolution = ( render.resolution_x * render.resolution_percentage / 100,
+                       render.resolution_y * render.resolution_percentage / 100 )
+
+        chain, obj = [], camera
+        while obj is not None:
+            chain.append( obj )
+            obj = obj.parent
+        moving = any( obj.animation_data is not None or len( obj.constraints ) for obj in chain ) \
+                 or camera.data.animation_data is not None
+
+        frames = [ None ]
+        if moving:
+            frames = list( range( scene.frame_start, scene.frame_end + 1, self.culling_frame_step ) )
+            if not frames or frames[-1] != scene.frame_end:
+                frames.append( scene.frame_end )
+
+        frame_current = scene.frame_current
+        matrices      = []
+        views         = []
+        for frame in frames:
+            if frame is not None:
+                scene.frame_set( frame )
+            depsgraph   = bpy.context.evaluated_depsgraph_get()
+            camera_eval = camera.evaluated_get( depsgraph )
+            projection  = camera_eval.calc_matrix_camera(
+                depsgraph, x=int( resolution[0] ), y=int( resolution[1] ),
+                scale_x=render.pixel_aspect_x, scale_y=render.pixel_aspect_y )
+            view        = camera_eval.matrix_world.inverted()
+            matrices.append( np.array( projection @ view ) )
+            views.append( np.array( view ) )
+        if moving:
+            scene.frame_set( frame_current )
+
+        return np.array( matrices ), np.array( views ), resolution
+
+    def collapse_leaves( self, leaf_geometry ):
+        """ function name:  collapse_leaves
+            parameters:     leaf_geometry [MeshGeometry] - Geometry of the leaves mesh (object space)
+            description:    Computes the collapsed (invisible) state of all leaves in one pass,
+                            by moving every leaf's vertices to that leaf's center
+            return value:   Vertex coordinates array where every leaf is collapsed to its center
+        """
+        return collapse_faces( leaf_geometry.co, leaf_geometry.centers,
+                               leaf_geometry.loop_vertices, leaf_geometry.loop_total )
+
+    def create_shapekey( self, leaves, leaf_idx, leaf_vertices, base_co, collapsed_co, co_buffer ):
+        """ function name:  create_shapekey
+            parameters:     leaves        [Mesh obj]    - the leaves mesh object
+                            leaf_idx      [Int]         - Index of the leaf (face on the leaves mesh object)
+                            leaf_vertices [Int array]   - Indices of the vertices of the leaf to be shape keyed
+                            base_co       [Float array] - The basis coordinates of all vertices
+                            collapsed_co  [Float array] - Coordinates of all vertices with every leaf collapsed
+                            co_buffer     [Float array] - Working copy of base_co (restored before returning)
+            description:    Creates a shape key for the current leaf (face on leaves mesh object), where
+                            the leaf is collapsed to its center. This will enable to animate the progressive
+                            growth of this leaf on its branch. The shape key is written directly to the data,
+                            without operators or switching to edit mode
+            return value:   The name of the new shape key
+        """
+
+        # Create a shapekey for this leaf. Every name is unique, since making a repeated
+        # name unique means searching all the shape keys that were already created
+        current_shape_key = leaves.shape_key_add( name=leaf_shape_key_name( leaf_idx ), from_mix=False )
+
+        co_buffer[ leaf_vertices ] = collapsed_co[ leaf_vertices ]  # Collapse only this leaf
+        current_shape_key.data.foreach_set( "co", co_buffer.ravel() )
+        co_buffer[ leaf_vertices ] = base_co[ leaf_vertices ]
+
+        return current_shape_key.name
+
+    def keyframe_shapekeys( self, leaves, shape_key_names, start_frames, end_frames ):
+        """ function name:  keyframe_shapekeys
+            parameters:     leaves          [Mesh obj]    - the leaves mesh object
+                            shape_key_names [List]        - Names of the leaves' shape keys
+                            start_frames    [Float array] - The frames where each leaf starts growing
+                            end_frames      [Float array] - The frames where each leaf is at full size
+            description:    Writes the growth keyframes of all leaves directly into the F-curves of the
+                            shape keys' action, without changing the current frame. Every leaf is
+                            invisible (value 1) from the start of the build until it starts growing,
+                            and at full size (value 0) when it ends growing
+        """
+
+        build_start_frame = bpy.context.scene.BranchesAnimProperties.frame_start
+        shape_keys        = leaves.data.shape_keys
+
+        frames = np.empty( ( len( shape_key_names ), 3 ), dtype=np.float32 )
+        frames[:, 1] = np.floor( start_frames )
+        frames[:, 0] = np.minimum( build_start_frame, frames[:, 1] )  # Ivies can start earlier (frame offsets)
+        frames[:, 2] = np.floor( end_frames   )
+        values = np.array( [ 1, 1, 0 ], dtype=np.float32 )
+
+        for name, leaf_frames in zip( shape_key_names, frames ):
+            fcurve = new_fcurve( shape_keys, shape_key_data_path( name ) )
+            write_keyframes( fcurve, leaf_frames, values )
+
+    def write_growth_attributes( self, leaves, start_frames, end_frames ):
+        """ function name:  write_growth_attributes
+            parameters:     leaves       [Mesh obj]    - the leaves mesh object
+                            start_frames [Float array] - The frames where each leaf starts growing
+                            end_frames   [Float array] - The frames where each leaf is at full size
+            description:    Stores every leaf's growth frames as face attributes of the leaves mesh,
+                            and adds a single geometry nodes modifier that scales each leaf around
+                            its center according to them. Memory use only depends on the mesh size
+                            and evaluation is one modifier, no matter how many leaves there are.
+                            Every leaf grows for at least one frame: Map Range returns 0 when its From
+                            Min and From Max are equal, which would keep the leaf hidden forever
+        """
+        start_frames = np.floor( start_frames )
+        write_face_attribute( leaves.data, LEAF_GROW_START_ATTRIBUTE, start_frames )
+        write_face_attribute( leaves.data, LEAF_GROW_END_ATTRIBUTE,
+                              np.maximum( np.floor( end_frames ), start_frames + 1 ) )
+
+        modifier = leaves.modifiers.get( LEAF_GROWTH_MODIFIER )
+        if modifier is None:
+            modifier = leaves.modifiers.new( LEAF_GROWTH_MODIFIER, 'NODES' )
+        modifier.node_group = ensure_leaf_growth_node_group()
+
+    def read_growth_frames( self, leaves ):
+        """ function name:  read_growth_frames
+            parameters:     leaves [Mesh obj] - the animated leaves mesh object
+            description:    Reads back the growth frames of every leaf from the animation of the growth
+                            mode the leaves were animated in (the growth attributes, or the keyframes of
+                            the shape keys), whatever the panel's growth mode is now.
+                            Leaves without a keyframed shape key are always grown, unless they share
+                            the one of their cluster or are hidden (camera culling)
+            return value:   The start and end frame arrays, and how the leaves' scale is interpolated
+                            between them (one of core.LEAF_INTERPOLATIONS)
+        """
+        leaf_count  = len( leaves.data.polygons )
+        growth_mode = leaves.get( LEAF_GROWTH_MODE_PROPERTY, self.growth_mode )  # Animated before it was stored
+
+        if growth_mode == 'ATTRIBUTE':
+            if LEAF_GROW_START_ATTRIBUTE not in leaves.data.attributes:
+                raise RuntimeError( "The leaves of %s are not animated yet, animate them first" % leaves.name )
+            return ( read_face_attribute( leaves.data, LEAF_GROW_START_ATTRIBUTE ),
+                     read_face_attribute( leaves.data, LEAF_GROW_END_ATTRIBUTE ), 'LINEAR' )
+
+        shape_keys = leaves.data.shape_keys
+        action     = shape_keys.animation_data.action \
+                     if shape_keys is not None and shape_keys.animation_data else None
+        if action is None:
+            raise RuntimeError( "The leaves of %s are not animated yet, animate them first" % leaves.name )
+
+        fcurves = { fcurve.data_path : fcurve for fcurves in action_fcurves( action ) for fcurve in fcurves }
+
+        start_frames = np.full( leaf_count, ALWAYS_GROWN_FRAMES[0] )
+        end_frames   = np.full( leaf_count, ALWAYS_GROWN_FRAMES[1] )
+        co           = np.empty( 6, dtype=np.float32 )  # The three keyframes written by keyframe_shapekeys
+        for leaf_idx in range( leaf_count ):
+            fcurve = fcurves.get( shape_key_data_path( leaf_shape_key_name( leaf_idx ) ) )
+            if fcurve is None or len( fcurve.keyframe_points ) != 3:
+                continue
+            fcurve.keyframe_points.foreach_get( "co", co )
+            start_frames[leaf_idx], end_frames[leaf_idx] = co[2], co[4]
+
+        # The leaves of a cluster share the shape key of its first leaf
+        clusters = leaves.get( LEAF_CLUSTERS_PROPERTY )
+        if clusters is not None and len( clusters ) == leaf_count:
+            clusters = np.asarray( clusters )
+            shared   = clusters >= 0
+            hidden   = clusters == HIDDEN_CLUSTER
+            start_frames[shared] = start_frames[ clusters[shared] ]
+            end_frames[shared]   = end_frames[ clusters[shared] ]
+            start_frames[hidden] = NEVER_GROWN_FRAMES[0]
+            end_frames[hidden]   = NEVER_GROWN_FRAMES[1]
+
+        # Two flat bezier keyframes ease the shape key in and out
+        return start_frames, end_frames, 'SMOOTH'
+
+    def animate_leaves( self, leaves_object_name, ivy_objects, profiler=None ):
+        """ function name:  animate_leaves
+            parameters:     leaves_object_name [string]
+                            ivy_objects        [List of Mesh Objects]
+                            profiler           [StageProfiler] - Collects timings and reports progress (optional)
+            description:    Master function for the leaves' animations. Reads all leaves at once,
+                            calculates what branch is the closest to each, and uses that information
+                            to create and animate shapekeys where this leaf grows gradually
+                            (or, in attribute growth mode, to store the growth frames on the mesh)
+            return value:   LEAF_SCHEDULE_DTYPE array with the closest branch and the growth frames of every
+                            leaf (branch -1 and the always grown frames for the leaves that are not animated)
+        """
+        job = LeafAnimationJob( self, bpy.data.objects[leaves_object_name], ivy_objects, profiler )
+        job.start()
+        job.run()
+        job.finish()
+        return job.schedule
+
+
+class IvyPairItem( bpy.types.PropertyGroup ):
+
+    branch_object : bpy.props.StringProperty(  # The ivy curve (or its prepared branches)
+        name="branch_object",
+        description="The ivy object whose branches are animated"
+        )
+    leaves_object : bpy.props.StringProperty(  # The leaves growing on it
+        name="leaves_object",
+        description="The leaves object that grows on this ivy"
+        )
+    frame_offset : bpy.props.IntProperty(  # Shifts the whole ivy's growth
+        name="frame_offset",
+        description="Frames to shift the growth of this ivy by, relative to frame_start",
+        default=0
+        )
+    enabled : bpy.props.BoolProperty(
+        name="enabled",
+        description="Animate this ivy with Animate All Ivies",
+        default=True
+        )
+
+class BakeProperties( bpy.types.PropertyGroup ):
+
+    bake_filepath : bpy.props.StringProperty(  # Where the growth cache is written
+        name="bake_filepath",
+        description="Where to save the growth cache (relative to the .blend file, so render nodes find it)",
+        default="//ivy_growth.npz",
+        subtype='FILE_PATH'
+        )
+    hide_sources : bpy.props.BoolProperty(  # The playback object replaces the animated objects
+        name="hide_sources",
+        description="Hide the animated branches and leaves in the viewport and in renders, so only the "
+                    "playback object is evaluated",
+        default=True
+        )
+
+    def bake_growth( self, ivy_objects, leaves, profiler=None ):
+        """ function name:  bake_growth
+            parameters:     ivy_objects [List]          - Array of animated ivy branches
+                            leaves      [Mesh obj]      - the animated leaves mesh object (or None)
+                            profiler    [StageProfiler] - Collects timings (optional)
+            description:    Records the world space geometry of the branches and leaves, the frame where
+                            every branch face appears and the growth frames of every leaf into a growth
+                            cache, and saves it to bake_filepath
+            return value:   The GrowthCache
+        """
+        profiler  = profiler or StageProfiler()
+        scene     = bpy.context.scene
+        materials = []
+
+        with profiler.stage( "branch geometry" ):
+            geometries, face_branch, face_position = read_branch_geometry( ivy_objects )
+            branches = merge_meshes( [ read_bake_mesh( bpy.data.objects[name], geometry, materials )
+                                       for name, geometry in zip( group_branches_by_object( ivy_objects ),
+                                                                  geometries ) ] or [ empty_mesh() ] )
+
+            schedule = scene.LeavesAnimProperties.get_branch_windows(
+                ivy_objects, scene.BranchesAnimProperties.modifier_name )
+            face_appear = face_appear_frames( schedule, face_branch, face_position )
+
+        with profiler.stage( "leaf geometry" ):
+            if leaves is None:
+                leaf_mesh     = empty_mesh()
+                start_frames  = end_frames = np.empty( 0 )
+                interpolation = 'LINEAR'
+            else:
+                start_frames, end_frames, interpolation = \
+                    scene.LeavesAnimProperties.read_growth_frames( leaves )
+                leaf_mesh = read_bake_mesh( leaves, MeshGeometry.from_object( leaves ), materials )
+
+        with profiler.stage( "cache build" ):
+            cache = GrowthCache.build( branches, face_appear, leaf_mesh, start_frames, end_frames,
+                                       interpolation, materials )
+
+        with profiler.stage( "cache write" ):
+            filepath = bpy.path.abspath( self.bake_filepath )
+            os.makedirs( os.path.dirname( filepath ) or ".", exist_ok=True )
+            cache.save( filepath )
+            loaded_growth_caches[filepath] = ( os.path.getmtime( filepath ), cache )
+
+        profiler.count( "baked faces", len( cache.loop_total ) )
+        return cache
+
+    def create_playback_object( self, name, cache, sources ):
+        """ function name:  create_playback_object
+            parameters:     name    [String]      - Name of the playback object
+                            cache   [GrowthCache] - The baked growth
+                            sources [List]        - The animated objects that were baked
+            description:    Creates (or updates) the mesh object that shows the growth cache at the
+                            current frame, which the frame change handler keeps up to date
+            return value:   The playback object
+        """
+        obj = bpy.data.objects.get( name )
+        if obj is None or obj.type != 'MESH':
+            obj = bpy.data.objects.new( name, bpy.data.meshes.new( name ) )
+            for collection in sources[0].users_collection or [ bpy.context.scene.collection ]:
+                collection.objects.link( obj )
+
+        obj.matrix_world = mathutils.Matrix.Identity( 4 )  # The cache is in world space
+        obj[BAKE_FILEPATH_PROPERTY] = self.bake_filepath
+
+        mesh = obj.data
+        mesh.materials.clear()
+        for material_name in cache.materials:
+            mesh.materials.append( bpy.data.materials.get( material_name ) if material_name else None )
+
+        if self.hide_sources:
+            for source in sources:
+                source.hide_viewport = True
+                source.hide_render   = True
+
+        write_playback_mesh( mesh, cache, bpy.context.scene.frame_current_final )
+        return obj
+
+class ProfilingProperties( bpy.types.PropertyGroup ):
+
+    print_summary : bpy.props.BoolProperty(  # Print the stage timings when an operator finishes
+        name="print_summary",
+        description="Print the time spent in every stage to the console when an animation finishes",
+        default=False
+        )
+    write_stats : bpy.props.BoolProperty(  # Record the whole run with cProfile
+        name="write_stats",
+        description="Record the animation with cProfile and save the stats to the file below",
+        default=False
+        )
+    stats_filepath : bpy.props.StringProperty(
+        name="stats_filepath",
+        description="Where to save the cProfile stats",
+        default="//ivy_growth.prof",
+        subtype='FILE_PATH'
+        )
+
+classes = (
+    IvyGrowthAnimator,
+    IVY_UL_ivy_pairs,
+    BranchesAnimProperties,
+    LeavesAnimProperties,
+    IvyPairItem,
+    BakeProperties,
+    ProfilingProperties,
+    AnimateLeaves,
+    RetimeLeaves,
+    AnimateBranches,
+    AddIvyPair,
+    RemoveIvyPair,
+    AnimateIvyPairs,
+    BakeGrowth
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+    # Create poperties for branch and leaf object selection boxes (in the panel)
+    bpy.types.Scene.BranchObject = bpy.props.StringProperty()
+    bpy.types.Scene.LeavesObject = bpy.props.StringProperty()
+    bpy.types.Scene.BranchesAnimProperties = bpy.props.PointerProperty(type=BranchesAnimProperties)
+    bpy.types.Scene.LeavesAnimProperties   = bpy.props.PointerProperty(type=LeavesAnimProperties)
+    bpy.types.Scene.IvyPairs               = bpy.props.CollectionProperty(type=IvyPairItem)
+    bpy.types.Scene.IvyPairsIndex          = bpy.props.IntProperty()
+    bpy.types.Scene.BakeProperties         = bpy.props.PointerProperty(type=BakeProperties)
+    bpy.types.Scene.ProfilingProperties    = bpy.props.PointerProperty(type=ProfilingProperties)
+
+    bpy.app.handlers.frame_change_pre.append( update_growth_playback )
+
+def unregister():
+    if update_growth_playback in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.remove( update_growth_playback )
+
+    del bpy.types.Scene.ProfilingProperties
+    del bpy.types.Scene.BakeProperties
+    del bpy.types.Scene.IvyPairsIndex
+    del bpy.types.Scene.IvyPairs
+    del bpy.types.Scene.LeavesAnimProperties
+    del bpy.types.Scene.BranchesAnimProperties
+    del bpy.types.Scene.LeavesObject
+    del bpy.types.Scene.BranchObject
+
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
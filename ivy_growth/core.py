@@ -0,0 +1,812 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+#  Computational core of the Ivy Growth Animator.
+#
+#  Everything here takes NumPy arrays and returns NumPy arrays, without bpy or
+#  mathutils, so it runs (and can be tested and benchmarked) in plain Python and
+#  in worker processes. The add-on reads the scene into arrays, calls these
+#  functions, and writes the results back.
+
+import multiprocessing, os, sys
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # Not bundled with Blender, the NumPy search is used instead
+    cKDTree = None
+
+# ---------------------------------------------------------------------------
+# Measurements
+# ---------------------------------------------------------------------------
+
+def peak_rss_mb():
+    """ The process' memory high-water mark so far (MB), or None if it can't be measured """
+    if resource is None:
+        return None
+    peak = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+    return peak / ( 1024 * 1024 ) if sys.platform == "darwin" else peak / 1024
+
+def current_rss_mb():
+    """ The process' memory in use right now (MB), or None if it can't be measured (only Linux has
+        /proc/self/statm). Sampled while a run goes on, the highest sample is the run's own high-water
+        mark, unlike peak_rss_mb which never comes down from the peak of an earlier run
+    """
+    try:
+        with open( "/proc/self/statm" ) as statm:
+            pages = int( statm.read().split()[1] )  # Resident pages
+        return pages * os.sysconf( "SC_PAGE_SIZE" ) / ( 1024 * 1024 )
+    except ( OSError, ValueError, IndexError, AttributeError ):
+        return None
+
+# ---------------------------------------------------------------------------
+# Geometry
+# ---------------------------------------------------------------------------
+
+def transform_points( points, matrix ):
+    """ function name:  transform_points
+        parameters:     points [(N, 3) float array] - Coordinates to transform
+                        matrix [4x4 matrix]         - Transformation matrix (any 4x4 sequence)
+        return value:   The transformed coordinates, computed with a single matrix multiplication
+    """
+    matrix = np.array( matrix, dtype=np.float64 )
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+def sort_faces_by_distance( centers, point ):
+    """ function name:  sort_faces_by_distance
+        parameters:     centers [(F, 3) float array] - Face centers
+                        point   [Vector]             - The point to measure distances from
+        return value:   Face indices ordered by the distance of their centers from the point
+    """
+    distances = np.square( centers - np.asarray( point, dtype=centers.dtype ) ).sum( axis=1 )
+    return np.argsort( distances, kind='stable' )
+
+def find_loose_parts( vert_count, edges ):
+    """ function name:  find_loose_parts
+        parameters:     vert_count [Int]               - Number of vertices
+                        edges      [(E, 2) int array]  - Vertex indices of every edge
+        description:    Union-find over the whole edge array at once: the roots of the two ends of
+                        every edge are hooked under the smaller one, then all paths are compressed,
+                        until every edge connects two vertices with the same root
+        return value:   The loose part of every vertex. Parts are numbered by their first vertex
+    """
+    parent = np.arange( vert_count, dtype=np.int64 )
+    if len( edges ) == 0:
+        return parent
+
+    vert_a, vert_b = edges[:, 0], edges[:, 1]
+    while True:
+        root_a = parent[ vert_a ]
+        root_b = parent[ vert_b ]
+        linked = root_a != root_b
+        if not linked.any():
+            break
+
+        np.minimum.at( parent,
+                       np.maximum( root_a[linked], root_b[linked] ),
+                       np.minimum( root_a[linked], root_b[linked] ) )
+
+        while True:  # Compress the paths so that every vertex points at its root
+            grandparent = parent[ parent ]
+            if np.array_equal( grandparent, parent ):
+                break
+            parent = grandparent
+
+    roots, parts = np.unique( parent, return_inverse=True )
+    return parts
+
+def split_by_part( parts, part_count, order=None ):
+    """ function name:  split_by_part
+        parameters:     parts      [Int array] - Part of every element
+                        part_count [Int]       - Number of parts
+                        order      [Int array] - Order of the elements to keep within every part
+                                                 (default: ascending indices)
+        description:    Groups the elements with one stable sort, instead of a pass over all elements
+                        for every part
+        return value:   List with the element indices of every part
+    """
+    parts = np.asarray( parts )
+    if order is None:
+        order = np.arange( len( parts ) )
+    order = order[ np.argsort( parts[ order ], kind='stable' ) ]
+    return np.split( order, np.searchsorted( parts[ order ], np.arange( 1, part_count ) ) )
+
+def collapse_faces( co, centers, loop_vertices, loop_total ):
+    """ function name:  collapse_faces
+        parameters:     co            [(V, 3) float array] - Vertex coordinates
+                        centers       [(F, 3) float array] - Face centers
+                        loop_vertices [(L,) int array]     - Vertex index of every loop
+                        loop_total    [(F,) int array]     - Number of loops of every face
+        return value:   Vertex coordinates where every face is collapsed to its center
+    """
+    collapsed_co = co.copy()
+    collapsed_co[ loop_vertices ] = np.repeat( centers, loop_total, axis=0 )
+    return collapsed_co
+
+# ---------------------------------------------------------------------------
+# Nearest branch
+# ---------------------------------------------------------------------------
+
+def spatial_buckets( points, bucket_size ):
+    """ function name:  spatial_buckets
+        parameters:     points      [(N, 3) float array] - Coordinates to split
+                        bucket_size [Int]                - Largest number of points per bucket
+        description:    Splits the points like a balanced KD-tree: every level sorts each segment along
+                        its longest axis and halves it, all segments of a level at once. The point count
+                        is padded (by repeating the last point) to fill a power of two of equal buckets
+        return value:   (B, S) array with the point indices of every bucket, S <= bucket_size
+    """
+    count    = len( points )
+    levels   = max( 0, int( np.ceil( np.log2( count / bucket_size ) ) ) ) if count else 0
+    segments = 2 ** levels
+    size     = -( -count // segments )
+
+    order = np.concatenate( [ np.arange( count ), np.full( segments * size - count, count - 1 ) ] )
+    for level in range( levels ):
+        order  = order.reshape( 2 ** level, -1 )
+        coords = points[ order ]
+        axis   = ( coords.max( axis=1 ) - coords.min( axis=1 ) ).argmax( axis=1 )
+        keys   = np.take_along_axis( coords, axis[:, None, None], axis=2 )[..., 0]
+        order  = np.take_along_axis( order, np.argsort( keys, axis=1, kind='stable' ), axis=1 )
+
+    return order.reshape( segments, size )
+
+def box_distance( low, high, box_low, box_high ):
+    """ Lower bound of the manhattan distance between the box low-high and every box_low-box_high box """
+    return ( np.maximum( box_low - high, 0 ) + np.maximum( low - box_high, 0 ) ).sum( axis=-1 )
+
+class ManhattanIndex:
+    """ class name:     ManhattanIndex
+        description:    Finds the nearest point by the sum of axis distances (manhattan distance).
+                        Uses SciPy's KD-tree when it is installed. Otherwise the points are split into
+                        spatially compact buckets, grouped into bigger boxes, and every chunk of nearby
+                        queries only measures the buckets (of the groups) whose bounding box could hold
+                        a point closer than the nearest point of the closest buckets
+    """
+
+    def __init__( self, points, bucket_size=32, group_size=64 ):
+        """ parameters:     points      [(N, 3) float array] - The points to search
+                            bucket_size [Int]                - Points per bucket of the NumPy search
+                            group_size  [Int]                - Buckets per group of the NumPy search
+        """
+        self.points = np.asarray( points, dtype=np.float64 ).reshape( -1, 3 )
+        self.tree   = None
+
+        if len( self.points ) == 0:
+            return
+
+        if cKDTree is not None:
+            self.tree = cKDTree( self.points )
+            return
+
+        # Repeated (padding) points never change the nearest point
+        self.bucket_index  = spatial_buckets( self.points, bucket_size )
+        self.bucket_points = self.points[ self.bucket_index ]
+        self.bucket_low    = self.bucket_points.min( axis=1 )
+        self.bucket_high   = self.bucket_points.max( axis=1 )
+
+        # There is a power of two of buckets, and consecutive buckets are halves of the same split
+        self.group_size = min( group_size, len( self.bucket_index ) )
+        self.group_low  = self.bucket_low.reshape(  -1, self.group_size, 3 ).min( axis=1 )
+        self.group_high = self.bucket_high.reshape( -1, self.group_size, 3 ).max( axis=1 )
+
+    def __len__( self ):
+        return len( self.points )
+
+    def group_buckets( self, groups ):
+        return ( groups[:, None] * self.group_size + np.arange( self.group_size ) ).ravel()
+
+    def query( self, queries, chunk_size=8, max_elements=1 << 20 ):
+        """ function name:  query
+            parameters:     queries      [(Q, 3) float array] - The points to find the nearest point for
+                            chunk_size   [Int]                - Queries measured together
+                            max_elements [Int]                - Limit of the distance matrix of a chunk
+            return value:   Index of the nearest point of every query, or -1 if there are no points
+        """
+        queries = np.asarray( queries, dtype=np.float64 ).reshape( -1, 3 )
+        if len( self.points ) == 0:
+            return np.full( len( queries ), -1, dtype=np.int64 )
+
+        if self.tree is not None:
+            distances, nearest = self.tree.query( queries, p=1 )
+            return nearest.astype( np.int64 )
+
+        nearest     = np.empty( len( queries ), dtype=np.int64 )
+        bucket_size = self.bucket_index.shape[1]
+
+        # Chunks of nearby queries share their candidate buckets
+        for chunk in spatial_buckets( queries, chunk_size ):
+            chunk = np.unique( chunk )
+            point = queries[chunk][:, None, :]
+            low, high = point.min( axis=0 ), point.max( axis=0 )
+
+            # The nearest points of the closest buckets bound the distances from above
+            group_lower = box_distance( low, high, self.group_low, self.group_high )
+            buckets     = self.group_buckets( np.argsort( group_lower )[:2] )
+            lower       = box_distance( low, high, self.bucket_low[buckets], self.bucket_high[buckets] )
+            closest     = self.bucket_points[ buckets[ np.argsort( lower )[:4] ] ].reshape( -1, 3 )
+            best        = np.abs( closest - point ).sum( axis=2 ).min( axis=1 ).max()
+
+            # Only the buckets (of the groups) closer than that can hold the nearest points
+            buckets    = self.group_buckets( np.flatnonzero( group_lower <= best ) )
+            lower      = box_distance( low, high, self.bucket_low[buckets], self.bucket_high[buckets] )
+            candidates = buckets[ lower <= best ]
+
+            best_distance = np.full( len( chunk ), np.inf )
+            best_index    = np.zeros( len( chunk ), dtype=np.int64 )
+            step = max( 1, max_elements // ( len( chunk ) * bucket_size ) )
+            for block_start in range( 0, len( candidates ), step ):
+                block     = candidates[ block_start : block_start + step ]
+                distances = np.abs( self.bucket_points[block].reshape( -1, 3 ) - point ).sum( axis=2 )
+                closest   = distances.argmin( axis=1 )
+                distance  = distances[ np.arange( len( chunk ) ), closest ]
+                better    = distance < best_distance
+
+                best_distance[better] = distance[better]
+                best_index[better]    = self.bucket_index[block].ravel()[ closest[better] ]
+
+            nearest[chunk] = best_index
+
+        return nearest
+
+# Index of the worker processes, built once per process by the pool initializer
+_worker_index = None
+
+def _init_worker( points ):
+    global _worker_index
+    _worker_index = ManhattanIndex( points )
+
+def _query_worker( queries ):
+    return _worker_index.query( queries )
+
+class NearestPool:
+    """ class name:     NearestPool
+        description:    Worker processes that each index the same points once, and then answer any
+                        number of nearest point queries, split across the workers. A query can run in
+                        the background (query_async) while the caller keeps doing other work
+    """
+
+    def __init__( self, points, processes, min_chunk=1024 ):
+        """ parameters:     points    [(N, 3) float array] - The points to search
+                            processes [Int]                - Worker processes
+                            min_chunk [Int]                - Fewest queries worth sending to a worker
+        """
+        # Spawned workers only import this module, never the application that called it
+        context = multiprocessing.get_context( "spawn" )
+        self.pool      = context.Pool( processes, initializer=_init_worker, initargs=( points, ) )
+        self.processes = processes
+        self.min_chunk = min_chunk
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
+
+    def query_async( self, queries ):
+        """ Starts searching the nearest point of every query, returns the pending result for result() """
+        queries = np.asarray( queries, dtype=np.float64 ).reshape( -1, 3 )
+        chunks  = max( 1, min( self.processes * 4, len( queries ) // self.min_chunk ) )
+        return self.pool.map_async( _query_worker, np.array_split( queries, chunks ) )
+
+    @staticmethod
+    def result( pending ):
+        """ Waits for a query_async and returns the index of the nearest point of every query """
+        return np.concatenate( pending.get() )
+
+    def query( self, queries ):
+        return self.result( self.query_async( queries ) )
+
+    def close( self ):
+        """ Stops the workers, and any query still running """
+        self.pool.terminate()
+        self.pool.join()
+
+def assign_nearest( points, point_labels, queries, processes=1, min_chunk=1024 ):
+    """ function name:  assign_nearest
+        parameters:     points       [(N, 3) float array] - The points to search (e.g. branch face centers)
+                        point_labels [(N,) int array]     - Label of every point (e.g. its branch)
+                        queries      [(Q, 3) float array] - The points to label (e.g. leaf centers)
+                        processes    [Int]                - Worker processes. With more than one, the
+                                                            queries are split across a multiprocessing pool
+                        min_chunk    [Int]                - Fewest queries worth sending to a worker
+        description:    Labels every query with the label of its nearest point (manhattan distance)
+        return value:   Label of every query, or -1 if there are no points
+    """
+    queries = np.asarray( queries, dtype=np.float64 ).reshape( -1, 3 )
+    if len( points ) == 0:
+        return np.full( len( queries ), -1, dtype=np.int64 )
+
+    chunks = min( processes * 4, len( queries ) // min_chunk )
+    if processes > 1 and chunks > 1:
+        with NearestPool( points, processes, min_chunk ) as pool:
+            nearest = pool.query( queries )
+    else:
+        nearest = ManhattanIndex( points ).query( queries )
+
+    return np.asarray( point_labels )[ nearest ]
+
+# ---------------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------------
+
+# Build start frame and duration of every branch
+BRANCH_SCHEDULE_DTYPE = np.dtype( [ ( "start", np.float64 ), ( "duration", np.float64 ) ] )
+
+# Random part of every leaf's timing, drawn before the leaves are matched with their branches
+LEAF_DRAWS_DTYPE = np.dtype( [ ( "delay", np.float64 ), ( "length", np.float64 ) ] )
+
+# Closest branch, and the frames where every leaf starts and ends growing
+LEAF_SCHEDULE_DTYPE = np.dtype( [ ( "branch", np.int32 ), ( "start", np.float64 ), ( "end", np.float64 ) ] )
+
+# How the delay of a leaf is drawn
+DELAY_DISTRIBUTIONS = ( 'UNIFORM', 'NORMAL', 'DISTANCE' )
+
+def compute_build_timing( facecounts, build_start_frame, build_interval, wait_between_branches,
+                          most_faces, base_build_length ):
+    """ function name:  compute_build_timing
+        parameters:     facecounts            [Int array] - Face count of every branch, in build order
+                        build_start_frame     [Int]       - When the first branch starts to build
+                        build_interval        [Int]       - Frames to wait before the second branch
+                        wait_between_branches [Int]       - Frames to wait between branches
+                        most_faces            [Int]       - Face count of the biggest branch
+                        base_build_length     [Int]       - Build length of the biggest branch
+        description:    The first branch starts at build_start_frame, every other branch starts after
+                        the build interval plus a wait per branch before it. Build lengths are in
+                        proportion to the face count, and at least one frame like the build
+                        modifier's frame duration
+        return value:   Two int arrays with the build start frame and duration of every branch
+    """
+    count     = np.arange( len( facecounts ) )
+    starts    = ( build_start_frame + build_interval + count * wait_between_branches ).astype( int )
+    starts[:1] = int( build_start_frame )
+
+    durations = np.maximum( ( np.asarray( facecounts ) / most_faces * base_build_length ).astype( int ), 1 )
+    return starts, durations
+
+def compute_appear_frames( face_parts, starts, durations ):
+    """ function name:  compute_appear_frames
+        parameters:     face_parts [Int array]   - Loose part of every face, faces in build order
+                        starts     [Float array] - Build start frame of every part
+                        durations  [Float array] - Build duration of every part
+        description:    A build modifier shows the first count * ( frame - start ) / duration faces,
+                        so the k-th face of a part appears at start + ( k + 1 ) * duration / count.
+                        Durations are clamped to at least one frame, like the modifier does
+        return value:   The frame where every face appears
+    """
+    durations = np.maximum( durations, 1 )
+    return starts[ face_parts ] + build_positions( face_parts, len( starts ) ) * durations[ face_parts ]
+
+def build_positions( face_parts, part_count ):
+    """ function name:  build_positions
+        parameters:     face_parts [Int array] - Loose part of every face, faces in build order
+                        part_count [Int]       - Number of parts
+        return value:   Fraction of its part's build duration after which every face appears,
+                        ( k + 1 ) / count for the k-th face of a part
+    """
+    part_counts = np.bincount( face_parts, minlength=part_count )
+
+    order = np.argsort( face_parts, kind='stable' )
+    ranks = np.empty( len( face_parts ), dtype=np.int64 )
+    ranks[ order ] = np.arange( len( face_parts ) ) - np.repeat(
+        np.cumsum( part_counts ) - part_counts, part_counts )
+
+    return ( ranks + 1 ) / part_counts[ face_parts ]
+
+def schedule_branches( facecounts, build_start_frame, build_interval, wait_between_branches, faces_per_frame ):
+    """ function name:  schedule_branches
+        parameters:     facecounts            [Int array] - Face count of every branch, in build order
+                        build_start_frame     [Int]       - When the first branch starts to build
+                        build_interval        [Int]       - Frames to wait before the second branch
+                        wait_between_branches [Int]       - Frames to wait between branches
+                        faces_per_frame       [Int]       - Build speed of the biggest branch
+        return value:   BRANCH_SCHEDULE_DTYPE array with the build window of every branch
+    """
+    most_faces = max( facecounts, default=0 )
+    schedule   = np.zeros( len( facecounts ), dtype=BRANCH_SCHEDULE_DTYPE )
+    if most_faces:
+        schedule["start"], schedule["duration"] = compute_build_timing(
+            facecounts, build_start_frame, build_interval, wait_between_branches,
+            most_faces, int( most_faces / faces_per_frame ) )
+    return schedule
+
+def draw_leaf_timing( count, delay_after_branch, min_growth_length, max_growth_length,
+                      seed=0, distribution='UNIFORM' ):
+    """ function name:  draw_leaf_timing
+        parameters:     count              [Int]    - Number of leaves
+                        delay_after_branch [Int]    - Longest delay of a leaf
+                        min_growth_length  [Int]    - Shortest growth of a leaf
+                        max_growth_length  [Int]    - Longest growth of a leaf
+                        seed               [Int]    - Seed of the random generator, the same seed
+                                                      always gives the same draws
+                        distribution       [String] - One of DELAY_DISTRIBUTIONS. UNIFORM and DISTANCE
+                                                      draw whole frames between 0 and the longest
+                                                      delay, NORMAL draws them around half of it
+        description:    Draws the random delay and growth length of all leaves in one batch
+        return value:   LEAF_DRAWS_DTYPE array
+    """
+    if distribution not in DELAY_DISTRIBUTIONS:
+        raise ValueError( "Unknown delay distribution %r" % distribution )
+
+    rng   = np.random.default_rng( seed )
+    draws = np.empty( count, dtype=LEAF_DRAWS_DTYPE )
+
+    if distribution == 'NORMAL':
+        draws["delay"] = np.clip( np.rint( rng.normal( delay_after_branch / 2, delay_after_branch / 6, count ) ),
+                                  0, delay_after_branch )
+    else:
+        draws["delay"] = rng.integers( 0, delay_after_branch, count, endpoint=True )
+
+    shortest, longest = sorted( ( min_growth_length, max_growth_length ) )
+    draws["length"]   = rng.integers( shortest, longest, count, endpoint=True )
+    return draws
+
+def schedule_leaves( branch_schedule, leaf_branches, draws, distribution='UNIFORM', leaf_positions=None ):
+    """ function name:  schedule_leaves
+        parameters:     branch_schedule [Array]       - BRANCH_SCHEDULE_DTYPE array of all branches
+                        leaf_branches   [Int array]   - Closest branch of every leaf
+                        draws           [Array]       - LEAF_DRAWS_DTYPE array of these leaves
+                        distribution    [String]      - The distribution the draws were made with
+                        leaf_positions  [Float array] - Fraction of the branch's build after which the
+                                                        closest face of every leaf appears (DISTANCE)
+        description:    Each leaf starts growing its delay after its branch finished building, and grows
+                        for its growth length. With the DISTANCE distribution, the delay counts from the
+                        moment the closest face of the branch appears instead, so leaves follow the
+                        growing tip of their branch. Leaves without a branch (-1, when there are no
+                        branch faces) are not timed from any branch: only their draws count, and the
+                        caller decides what they do
+        return value:   LEAF_SCHEDULE_DTYPE array
+    """
+    leaf_branches = np.asarray( leaf_branches )
+    assigned      = leaf_branches >= 0
+
+    starts    = np.zeros( len( leaf_branches ) )
+    durations = np.zeros( len( leaf_branches ) )
+    starts[ assigned ]    = branch_schedule["start"][ leaf_branches[ assigned ] ]
+    durations[ assigned ] = branch_schedule["duration"][ leaf_branches[ assigned ] ]
+    if distribution == 'DISTANCE':
+        durations = durations * leaf_positions
+
+    schedule = np.empty( len( leaf_branches ), dtype=LEAF_SCHEDULE_DTYPE )
+    schedule["branch"] = leaf_branches
+    schedule["start"]  = starts + durations + draws["delay"]
+    schedule["end"]    = schedule["start"] + draws["length"]
+    return schedule
+
+# ---------------------------------------------------------------------------
+# Camera culling
+# ---------------------------------------------------------------------------
+
+# What the camera pass does with every leaf: animate it on its own, leave it fully grown
+# (never in view), or give it the timing of its cluster (too small to tell apart)
+LEAF_ANIMATED, LEAF_STATIC, LEAF_CLUSTERED = 0, 1, 2
+
+def face_radii( co, centers, loop_vertices, loop_total ):
+    """ function name:  face_radii
+        parameters:     co            [(V, 3) float array] - Vertex coordinates
+                        centers       [(F, 3) float array] - Face centers
+                        loop_vertices [(L,) int array]     - Vertex index of every loop
+                        loop_total    [(F,) int array]     - Number of loops of every face
+        return value:   Distance from every face's center to its farthest vertex
+    """
+    if len( centers ) == 0:
+        return np.empty( 0 )
+    distances = np.linalg.norm( co[ loop_vertices ] - np.repeat( centers, loop_total, axis=0 ), axis=1 )
+    return np.maximum.reduceat( distances, np.cumsum( loop_total ) - loop_total )
+
+def classify_leaves( centers, radii, view_projections, resolution, min_pixel_size, views=None, orthographic=False ):
+    """ function name:  classify_leaves
+        parameters:     centers          [(N, 3) float array]    - Leaf centers, in world space
+                        radii            [(N,) float array]      - Leaf radii, in world space
+                        view_projections [(C, 4, 4) float array] - Projection times inverse camera matrix,
+                                                                   at every sampled frame
+                        resolution       [Tuple]                 - Render width and height in pixels
+                        min_pixel_size   [Float]                 - Smallest leaf, in pixels across,
+                                                                   that is animated on its own
+                        views            [(C, 4, 4) float array] - Inverse camera matrices (world to view
+                                                                   space), needed for orthographic cameras
+                        orthographic     [Boolean]               - The camera is orthographic
+        description:    Projects the bounding sphere of every leaf with every camera. A leaf that is
+                        never inside the sides of the view is STATIC, one that is but never gets
+                        min_pixel_size across is CLUSTERED, any other leaf is ANIMATED. Clipping
+                        distances are not checked, so the test errs on the side of animating.
+                        A perspective projection divides by the depth (w), an orthographic one keeps
+                        w at 1, so there the view space depth tells what is in front of the camera
+        return value:   Int8 array with the class of every leaf
+    """
+    radii       = np.asarray( radii, dtype=np.float64 )
+    homogeneous = np.hstack( [ centers, np.ones( ( len( centers ), 1 ) ) ] )
+    visible     = np.zeros( len( centers ), dtype=bool )
+    pixels      = np.zeros( len( centers ) )
+
+    view_projections = np.asarray( view_projections, dtype=np.float64 ).reshape( -1, 4, 4 )
+    if views is None:
+        if orthographic:
+            raise ValueError( "Orthographic cameras need their view matrices" )
+        views = np.zeros_like( view_projections )  # Only read for orthographic cameras
+    views = np.asarray( views, dtype=np.float64 ).reshape( -1, 4, 4 )
+
+    for matrix, view in zip( view_projections, views ):
+        clip = homogeneous @ matrix.T
+        if orthographic:
+            depth    = np.ones( len( centers ) )
+            in_front = homogeneous @ view[2] < radii  # View space z is negative in front of the camera
+            around   = np.zeros( len( centers ), dtype=bool )
+        else:
+            depth    = np.maximum( clip[:, 3], 1e-9 )
+            in_front = clip[:, 3] > 0
+            around   = np.abs( clip[:, 3] ) <= radii  # The camera is (almost) inside the sphere
+
+        # Half size of the sphere in normalized device coordinates
+        extent_x = radii * np.linalg.norm( matrix[0, :3] ) / depth
+        extent_y = radii * np.linalg.norm( matrix[1, :3] ) / depth
+
+        inside   = around | ( in_front
+                              & ( np.abs( clip[:, 0] / depth ) <= 1 + extent_x )
+                              & ( np.abs( clip[:, 1] / depth ) <= 1 + extent_y ) )
+        size     = np.where( around, np.inf, np.maximum( extent_x * resolution[0], extent_y * resolution[1] ) )
+
+        visible |= inside
+        pixels   = np.where( inside, np.maximum( pixels, size ), pixels )
+
+    classes = np.full( len( centers ), LEAF_ANIMATED, dtype=np.int8 )
+    classes[ visible & ( pixels < min_pixel_size ) ] = LEAF_CLUSTERED
+    classes[ ~visible ] = LEAF_STATIC
+    return classes
+
+def cluster_leaves( centers, classes, cluster_size ):
+    """ function name:  cluster_leaves
+        parameters:     centers      [(N, 3) float array] - Leaf centers
+                        classes      [(N,) int array]     - Class of every leaf (see classify_leaves)
+                        cluster_size [Int]                - Largest number of leaves per cluster
+        description:    Splits the CLUSTERED leaves into spatial buckets (see spatial_buckets). The
+                        first leaf of every bucket represents it: the others take its timing
+        return value:   Index of the leaf whose timing every leaf takes (its own, unless clustered)
+    """
+    representatives = np.arange( len( centers ) )
+    clustered       = np.flatnonzero( np.asarray( classes ) == LEAF_CLUSTERED )
+    if len( clustered ):
+        buckets = clustered[ spatial_buckets( centers[ clustered ], cluster_size ) ]
+        representatives[ buckets ] = buckets.min( axis=1 )[:, None]
+    return representatives
+
+# ---------------------------------------------------------------------------
+# Baking
+# ---------------------------------------------------------------------------
+
+# Layout version of the growth cache files, bumped whenever their arrays change
+GROWTH_CACHE_VERSION = 1
+
+# How a leaf's scale goes from 0 to 1: linearly (attribute mode's map range), or easing in and
+# out like the two flat bezier keyframes of its shape key
+LEAF_INTERPOLATIONS = ( 'LINEAR', 'SMOOTH' )
+
+# Per face and per loop arrays of the meshes that are merged into a growth cache
+MESH_FACE_ARRAYS = ( "loop_total", "material", "smooth" )
+MESH_LOOP_ARRAYS = ( "loop_vertices", "uv" )
+
+def face_appear_frames( branch_schedule, face_branch, face_position ):
+    """ function name:  face_appear_frames
+        parameters:     branch_schedule [Array]       - BRANCH_SCHEDULE_DTYPE array of all branches
+                        face_branch     [Int array]   - Branch of every face
+                        face_position   [Float array] - Fraction of its branch's build after which
+                                                        every face appears (see build_positions)
+        return value:   The frame where every face appears, the same for split and single mesh branches
+    """
+    return branch_schedule["start"][ face_branch ] + face_position * branch_schedule["duration"][ face_branch ]
+
+def leaf_growth( starts, ends, frame, interpolation='LINEAR' ):
+    """ function name:  leaf_growth
+        parameters:     starts        [Float array] - The frames where every leaf starts growing
+                        ends          [Float array] - The frames where every leaf is at full size
+                        frame         [Float]       - The frame to evaluate
+                        interpolation [String]      - One of LEAF_INTERPOLATIONS
+        return value:   The scale of every leaf at the frame, 0 until it starts growing and 1 once
+                        it is fully grown
+    """
+    growth = np.clip( ( frame - starts ) / np.maximum( ends - starts, 1e-6 ), 0.0, 1.0 )
+    if interpolation == 'SMOOTH':
+        growth = growth * growth * ( 3.0 - 2.0 * growth )  # Smoothstep
+    return growth
+
+def empty_mesh():
+    """ Returns a mesh dictionary (see reorder_faces) without vertices or faces """
+    return {
+        "co"            : np.empty( ( 0, 3 ), dtype=np.float32 ),
+        "loop_total"    : np.empty( 0, dtype=np.int32 ),
+        "material"      : np.empty( 0, dtype=np.int32 ),
+        "smooth"        : np.empty( 0, dtype=bool ),
+        "loop_vertices" : np.empty( 0, dtype=np.int32 ),
+        "uv"            : np.empty( ( 0, 2 ), dtype=np.float32 ),
+        }
+
+def face_loops( loop_start, loop_total, faces ):
+    """ function name:  face_loops
+        parameters:     loop_start [Int array] - Index of each face's first loop
+                        loop_total [Int array] - Number of loops of each face
+                        faces      [Int array] - The faces to take, in their new order
+        return value:   The indices of the loops of these faces, in the new order
+    """
+    new_total = loop_total[ faces ]
+    new_start = np.zeros( len( faces ), dtype=np.int64 )
+    np.cumsum( new_total[:-1], out=new_start[1:] )
+    return np.repeat( loop_start[ faces ] - new_start, new_total ) + np.arange( new_total.sum() )
+
+def reorder_faces( mesh, faces ):
+    """ function name:  reorder_faces
+        parameters:     mesh  [Dictionary] - co, and the MESH_FACE_ARRAYS and MESH_LOOP_ARRAYS of a mesh
+                        faces [Int array]  - The faces to keep, in their new order
+        return value:   A mesh dictionary with only these faces, in this order (and all the vertices)
+    """
+    loop_start = np.zeros( len( mesh["loop_total"] ), dtype=np.int64 )
+    np.cumsum( mesh["loop_total"][:-1], out=loop_start[1:] )
+    loops = face_loops( loop_start, mesh["loop_total"], faces )
+
+    reordered = { "co" : mesh["co"] }
+    reordered.update( { key : mesh[key][ faces ] for key in MESH_FACE_ARRAYS } )
+    reordered.update( { key : mesh[key][ loops ] for key in MESH_LOOP_ARRAYS } )
+    return reordered
+
+def merge_meshes( meshes ):
+    """ function name:  merge_meshes
+        parameters:     meshes [List] - Mesh dictionaries (see reorder_faces), in the same space
+        return value:   One mesh dictionary with the vertices and faces of all the meshes, in order
+    """
+    offsets = np.cumsum( [ 0 ] + [ len( mesh["co"] ) for mesh in meshes[:-1] ] )
+
+    merged = { key : np.concatenate( [ mesh[key] for mesh in meshes ] )
+               for key in ( "co", ) + MESH_FACE_ARRAYS + MESH_LOOP_ARRAYS }
+    merged["loop_vertices"] = np.concatenate(
+        [ mesh["loop_vertices"] + offset for mesh, offset in zip( meshes, offsets ) ] )
+    return merged
+
+class GrowthCache:
+    """ class name:     GrowthCache
+        description:    The baked growth of an ivy: one world space mesh with all branch and leaf faces,
+                        the frame where every branch face appears and the frames where every leaf
+                        grows. Branch faces are sorted by appear frame and leaves by growth start, so
+                        the faces shown at any frame are a prefix of each, and a frame is rebuilt with
+                        two binary searches and one vectorized scale of the leaf vertices, however many
+                        branches and leaves were animated
+        attributes:     co, loop_total, loop_vertices, material, smooth, uv - The merged mesh
+                        branch_faces [Int]         - Number of branch faces (the first faces)
+                        face_appear  [Float array] - Appear frame of every branch face, ascending
+                        leaf_start   [Float array] - Growth start of every leaf, ascending
+                        leaf_end     [Float array] - Growth end of every leaf
+                        leaf_centers [(N, 3) array] - The point every leaf grows from
+                        vertex_leaf  [Int array]   - Leaf of every vertex (-1 for branch vertices)
+                        interpolation [String]     - One of LEAF_INTERPOLATIONS
+                        materials    [String array] - Material names of the material indices
+                        frame_range  [Float array] - First and last frame where anything changes
+    """
+
+    # The arrays written to a cache file
+    ARRAYS = ( "co", "loop_total", "loop_vertices", "material", "smooth", "uv", "branch_faces",
+               "face_appear", "leaf_start", "leaf_end", "leaf_centers", "vertex_leaf",
+               "interpolation", "materials", "frame_range" )
+
+    def __init__( self, arrays ):
+        """ parameters:     arrays [Mapping] - The cache's arrays, by attribute name """
+        for key, value in arrays.items():
+            setattr( self, key, np.asarray( value ) )
+
+        self.branch_faces  = int( self.branch_faces )
+        self.interpolation = str( self.interpolation )
+
+        self.loop_start = np.zeros( len( self.loop_total ) + 1, dtype=np.int64 )
+        np.cumsum( self.loop_total, out=self.loop_start[1:] )
+
+        self.leaf_vertices = np.flatnonzero( self.vertex_leaf >= 0 )
+        self.vertex_leaves = self.vertex_leaf[ self.leaf_vertices ]
+
+    @classmethod
+    def build( cls, branches, face_appear, leaves, leaf_start, leaf_end,
+               interpolation='LINEAR', materials=() ):
+        """ function name:  build
+            parameters:     branches      [Dictionary]  - Mesh dictionary (see reorder_faces) of all branches
+                            face_appear   [Float array] - Appear frame of every branch face
+                            leaves        [Dictionary]  - Mesh dictionary of the leaves, one face per leaf
+                            leaf_start    [Float array] - The frames where every leaf starts growing
+                            leaf_end      [Float array] - The frames where every leaf is at full size
+                            interpolation [String]      - One of LEAF_INTERPOLATIONS
+                            materials     [List]        - Material names of the material indices
+            return value:   The GrowthCache
+        """
+        if interpolation not in LEAF_INTERPOLATIONS:
+            raise ValueError( "Unknown leaf interpolation %r" % interpolation )
+
+        branch_order = np.argsort( face_appear, kind='stable' )
+        leaf_order   = np.argsort( leaf_start,  kind='stable' )
+        branches     = reorder_faces( branches, branch_order )
+        leaves       = reorder_faces( leaves,   leaf_order   )
+        mesh         = merge_meshes( [ branches, leaves ] )
+
+        # The leaves' vertices come after the branches', and every leaf grows from its center
+        leaf_count  = len( leaf_order )
+        loop_leaf   = np.repeat( np.arange( leaf_count ), leaves["loop_total"] )
+        vertex_leaf = np.full( len( mesh["co"] ), -1, dtype=np.int32 )
+        vertex_leaf[ leaves["loop_vertices"] + len( branches["co"] ) ] = loop_leaf
+
+        leaf_centers = np.zeros( ( leaf_count, 3 ) )
+        np.add.at( leaf_centers, loop_leaf, leaves["co"][ leaves["loop_vertices"] ] )
+        leaf_centers /= np.maximum( leaves["loop_total"], 1 )[:, None]
+
+        leaf_start = np.asarray( leaf_start, dtype=np.float64 )[ leaf_order ]
+        leaf_end   = np.asarray( leaf_end,   dtype=np.float64 )[ leaf_order ]
+        face_appear = np.asarray( face_appear, dtype=np.float64 )[ branch_order ]
+
+        # Leaves that are not animated (always grown or never grown) are left out of the animated range
+        animated = ( leaf_end > -1e6 ) & ( leaf_start < 1e6 )
+        frames   = np.concatenate( [ face_appear, leaf_start[ animated ], leaf_end[ animated ] ] )
+
+        arrays = dict( mesh )
+        arrays.update(
+            version       = GROWTH_CACHE_VERSION,
+            branch_faces  = len( branch_order ),
+            face_appear   = face_appear,
+            leaf_start    = leaf_start,
+            leaf_end      = leaf_end,
+            leaf_centers  = leaf_centers.astype( np.float32 ),
+            vertex_leaf   = vertex_leaf,
+            interpolation = interpolation,
+            materials     = np.array( list( materials ), dtype=str ),
+            frame_range   = np.array( [ frames.min(), frames.max() ] if len( frames ) else [ 0.0, 0.0 ] ),
+            )
+        return cls( arrays )
+
+    def save( self, filepath ):
+        """ Writes the cache to a compressed .npz file (no pickled objects) """
+        np.savez_compressed( filepath, version=GROWTH_CACHE_VERSION,
+                             **{ key : getattr( self, key ) for key in self.ARRAYS } )
+
+    @classmethod
+    def load( cls, filepath ):
+        """ Reads a cache written by save, raises a ValueError if it has another layout version """
+        with np.load( filepath ) as data:
+            if "version" not in data.files or int( data["version"] ) != GROWTH_CACHE_VERSION:
+                raise ValueError( "%s is not a version %d growth cache" % ( filepath, GROWTH_CACHE_VERSION ) )
+            return cls( { key : data[key] for key in cls.ARRAYS } )
+
+    def frame( self, frame ):
+        """ function name:  frame
+            parameters:     frame [Float] - The frame to rebuild
+            return value:   The vertex coordinates at this frame (leaves scaled around their centers),
+                            the indices of the faces shown at this frame, and the indices of their loops
+        """
+        shown_branches = np.searchsorted( self.face_appear, frame, side='right' )  # Appeared at or before
+        shown_leaves   = np.searchsorted( self.leaf_start,  frame, side='left'  )  # Started growing
+
+        first_leaf = self.branch_faces
+        faces = np.concatenate( [ np.arange( shown_branches ),
+                                  np.arange( first_leaf, first_leaf + shown_leaves ) ] )
+        loops = np.concatenate( [ np.arange( self.loop_start[ shown_branches ] ),
+                                  np.arange( self.loop_start[ first_leaf ],
+                                             self.loop_start[ first_leaf + shown_leaves ] ) ] )
+
+        scale   = leaf_growth( self.leaf_start, self.leaf_end, frame, self.interpolation )
+        centers = self.leaf_centers[ self.vertex_leaves ]
+
+        co = self.co.copy()
+        co[ self.leaf_vertices ] = centers + ( co[ self.leaf_vertices ] - centers ) \
+                                   * scale[ self.vertex_leaves, None ]
+        return co, faces, loops
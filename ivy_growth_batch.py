@@ -0,0 +1,344 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+#  Headless batch animation for the Ivy Growth Animator.
+#
+#  Animate a single file (runs inside Blender):
+#
+#      blender -b ivy.blend --python ivy_growth_batch.py -- --config job.json
+#
+#  Animate a directory of files in a pool of Blender worker processes:
+#
+#      python ivy_growth_batch.py --blender /path/to/blender --input-dir blends/ \
+#                                 --output-dir animated/ --config job.json --workers 4
+#
+#  The job config is a JSON file with the object names and the animation
+#  parameters, which can also be given (or overridden) on the command line:
+#
+#      {
+#          "branch_object"   : "IvyCurve",
+#          "leaves_object"   : "IvyLeaf",
+#          "animate_branches": true,
+#          "animate_leaves"  : true,
+#          "bake_growth"     : false,
+#          "branches"        : { "frame_start": 1, "faces_per_frame": 4 },
+#          "leaves"          : { "delay_after_branch": 10 },
+#          "bake"            : { "bake_filepath": "//ivy_growth.npz" }
+#      }
+#
+#  Every run saves its output file and writes a JSON report with timings and counts.
+#  A run where an operator does not finish is reported as CANCELLED and not saved.
+#  With bake_growth, the growth cache is saved next to the output file, and found
+#  relative to it (so the two can be moved together), unless the config or the
+#  command line gives a bake_filepath.
+
+import argparse, json, os, subprocess, sys, time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import bpy
+except ImportError:  # Running as the batch driver, outside of Blender
+    bpy = None
+
+# Config keys (and command line options) of the property groups
+PROPERTY_GROUPS = {
+    "branches" : "BranchesAnimProperties",
+    "leaves"   : "LeavesAnimProperties",
+    "bake"     : "BakeProperties",
+    }
+
+def load_config( path ):
+    if not path:
+        return {}
+    with open( path ) as config_file:
+        return json.load( config_file )
+
+def write_report( path, report ):
+    if not path:
+        print( json.dumps( report, indent=4 ) )
+        return
+    with open( path, 'w' ) as report_file:
+        json.dump( report, report_file, indent=4 )
+
+# ---------------------------------------------------------------------------
+# Worker: animates the currently open .blend file (inside Blender)
+# ---------------------------------------------------------------------------
+
+def register_addon():
+    """ Registers the add-on from this directory, unless it is already enabled """
+    if hasattr( bpy.types.Scene, "BranchesAnimProperties" ):
+        return
+
+    sys.path.insert( 0, os.path.dirname( os.path.abspath( __file__ ) ) )
+    import ivy_growth
+    ivy_growth.register()
+
+def relink_growth_cache( filepath, new_filepath ):
+    """ Points the bake settings and the playback objects that use the growth cache at filepath
+        at new_filepath (the same file, given another way)
+    """
+    from ivy_growth.addon import BAKE_FILEPATH_PROPERTY
+
+    bpy.context.scene.BakeProperties.bake_filepath = new_filepath
+    for obj in bpy.data.objects:
+        if obj.get( BAKE_FILEPATH_PROPERTY ) == filepath:
+            obj[BAKE_FILEPATH_PROPERTY] = new_filepath
+
+def group_properties( props ):
+    """ Returns the editable properties of a property group, by name """
+    return { prop.identifier : prop for prop in props.bl_rna.properties
+             if prop.identifier not in ( "rna_type", "name" ) and not prop.is_readonly }
+
+def parse_worker_args( argv, scene ):
+    """ function name:  parse_worker_args
+        parameters:     argv  [List]  - The arguments after Blender's '--'
+                        scene [Scene] - The scene, used to list the animation properties
+        description:    Every property of the branches and leaves property groups is an option
+                        (e.g. --faces_per_frame 4), overriding the value in the config file
+        return value:   The parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="blender -b file.blend --python ivy_growth_batch.py --",
+        description="Animate the ivy of the open .blend file" )
+    parser.add_argument( "--config",        help="JSON job config" )
+    parser.add_argument( "--branch_object", help="Name of the ivy branches object" )
+    parser.add_argument( "--leaves_object", help="Name of the leaves object" )
+    parser.add_argument( "--output",        help="Where to save the animated file (default: overwrite the input)" )
+    parser.add_argument( "--report",        help="Where to write the JSON report (default: print it)" )
+    parser.add_argument( "--skip_branches", action="store_true", help="Do not animate the branches" )
+    parser.add_argument( "--skip_leaves",   action="store_true", help="Do not animate the leaves" )
+    parser.add_argument( "--bake",          action="store_true", help="Bake the growth to a cache file "
+                                                                      "played back by a single object" )
+
+    for group_key, group_name in PROPERTY_GROUPS.items():
+        group = parser.add_argument_group( group_key )
+        for identifier, prop in group_properties( getattr( scene, group_name ) ).items():
+            value_type = { 'INT': int, 'FLOAT': float, 'BOOLEAN': parse_bool }.get( prop.type, str )
+            group.add_argument( "--" + identifier, dest=group_key + "." + identifier,
+                                type=value_type, help=prop.description )
+
+    return parser.parse_args( argv )
+
+def parse_bool( value ):
+    return value.lower() in ( "1", "true", "yes", "on" )
+
+def configure_scene( scene, config, args ):
+    """ Sets the object names and animation properties from the config and the arguments """
+    scene.BranchObject = args.branch_object or config.get( "branch_object", scene.BranchObject )
+    scene.LeavesObject = args.leaves_object or config.get( "leaves_object", scene.LeavesObject )
+
+    for group_key, group_name in PROPERTY_GROUPS.items():
+        props  = getattr( scene, group_name )
+        values = dict( config.get( group_key, {} ) )
+        for identifier in group_properties( props ):
+            value = getattr( args, group_key + "." + identifier )
+            if value is not None:
+                values[identifier] = value
+
+        for identifier, value in values.items():
+            setattr( props, identifier, value )
+
+class OperatorCancelled( Exception ):
+    """ An operator of the job did not finish, the file is not saved """
+
+def run_operator( operator, timings, results, name ):
+    """ Runs the operator, records its time and result, and raises OperatorCancelled unless it finished """
+    start  = time.perf_counter()
+    result = operator()
+    timings[name] = time.perf_counter() - start
+    results[name] = sorted( result )
+    if results[name] != [ "FINISHED" ]:
+        raise OperatorCancelled( "%s returned %s" % ( name, ", ".join( results[name] ) ) )
+
+def animate_file( argv ):
+    """ function name:  animate_file
+        parameters:     argv [List] - The arguments after Blender's '--'
+        description:    Animates the branches and leaves of the open .blend file, saves it and
+                        writes a report with the time every stage took and the resulting counts
+        return value:   The report dictionary
+    """
+    register_addon()
+
+    scene  = bpy.context.scene
+    args   = parse_worker_args( argv, scene )
+    config = load_config( args.config )
+    configure_scene( scene, config, args )
+
+    output = args.output or config.get( "output" ) or bpy.data.filepath
+    report = {
+        "file"          : bpy.data.filepath,
+        "output"        : output,
+        "branch_object" : scene.BranchObject,
+        "leaves_object" : scene.LeavesObject,
+        "results"       : {},
+        "timings"       : {},
+        "counts"        : {},
+        }
+
+    total_start = time.perf_counter()
+    try:
+        if not args.skip_branches and config.get( "animate_branches", True ):
+            run_operator( bpy.ops.object.animate_branches, report["timings"], report["results"],
+                          "animate_branches" )
+
+        if not args.skip_leaves and config.get( "animate_leaves", True ) and scene.LeavesObject:
+            run_operator( bpy.ops.object.animate_leaves, report["timings"], report["results"],
+                          "animate_leaves" )
+
+        if args.bake or config.get( "bake_growth", False ):
+            bake_props = scene.BakeProperties
+            default_filepath = getattr( args, "bake.bake_filepath" ) is None and \
+                               "bake_filepath" not in config.get( "bake", {} )
+            if default_filepath:
+                # "//" only points next to the output file once it is saved there, so the cache is
+                # written to the absolute path, and the path relative to the output file is stored
+                cache_name = os.path.splitext( os.path.basename( output ) )[0] + ".npz"
+                bake_props.bake_filepath = os.path.join( os.path.dirname( os.path.abspath( output ) ), cache_name )
+            run_operator( bpy.ops.object.bake_growth, report["timings"], report["results"], "bake_growth" )
+            if default_filepath:
+                relink_growth_cache( bake_props.bake_filepath, "//" + cache_name )
+            report["bake_filepath"] = bake_props.bake_filepath
+
+        save_start = time.perf_counter()
+        bpy.ops.wm.save_as_mainfile( filepath=output )
+        report["timings"]["save"] = time.perf_counter() - save_start
+        report["status"] = "FINISHED"
+    except OperatorCancelled as error:
+        report["status"] = "CANCELLED"
+        report["error"]  = str( error )
+    except Exception as error:
+        report["status"] = "FAILED"
+        report["error"]  = repr( error )
+
+    report["timings"]["total"] = time.perf_counter() - total_start
+    report["counts"] = count_results( scene )
+
+    write_report( args.report, report )
+    return report
+
+def count_results( scene ):
+    """ Counts the branches, branch faces, leaves and leaf shape keys of the animated ivy """
+    counts = {}
+
+    if scene.BranchObject:
+        ivy_objects = scene.BranchesAnimProperties.find_ivy_branches( scene.BranchObject )
+        counts["branches"]     = len( ivy_objects )
+        counts["branch_faces"] = sum( branch["facecount"] for branch in ivy_objects )
+
+    leaves = bpy.data.objects.get( scene.LeavesObject )
+    if leaves is not None:
+        counts["leaves"]     = len( leaves.data.polygons )
+        shape_keys           = leaves.data.shape_keys
+        counts["shape_keys"] = len( shape_keys.key_blocks ) if shape_keys else 0
+
+    return counts
+
+# ---------------------------------------------------------------------------
+# Driver: animates a directory of .blend files in a pool of Blender processes
+# ---------------------------------------------------------------------------
+
+def parse_driver_args( argv ):
+    parser = argparse.ArgumentParser(
+        description="Animate every .blend file of a directory in a pool of headless Blender processes. "
+                    "Options after '--' are passed to every worker (e.g. -- --faces_per_frame 8)" )
+    parser.add_argument( "--blender",    default="blender", help="Blender executable" )
+    parser.add_argument( "--input-dir",  required=True,     help="Directory with the .blend files to animate" )
+    parser.add_argument( "--output-dir", required=True,     help="Directory for the animated files and reports" )
+    parser.add_argument( "--config",     help="JSON job config passed to every worker" )
+    parser.add_argument( "--workers",    type=int, default=os.cpu_count(), help="Number of Blender processes" )
+    parser.add_argument( "--timeout",    type=float, default=None, help="Time limit per file (seconds)" )
+    parser.add_argument( "--report",     help="Where to write the summary report "
+                                              "(default: batch_report.json in the output directory)" )
+
+    if "--" in argv:
+        split = argv.index( "--" )
+        return parser.parse_args( argv[:split] ), argv[split + 1:]
+    return parser.parse_args( argv ), []
+
+def run_worker( blender, blend_path, output_dir, config, extra_args, timeout ):
+    """ function name:  run_worker
+        description:    Animates one file in its own Blender process
+        return value:   The worker's report (or a failure report if the process failed)
+    """
+    name        = os.path.splitext( os.path.basename( blend_path ) )[0]
+    output_path = os.path.abspath( os.path.join( output_dir, name + ".blend" ) )
+    report_path = os.path.abspath( os.path.join( output_dir, name + ".report.json" ) )
+
+    command = [ blender, "-b", blend_path, "--python", os.path.abspath( __file__ ), "--",
+                "--output", output_path, "--report", report_path ] + extra_args
+    if config:
+        command += [ "--config", os.path.abspath( config ) ]
+
+    if os.path.exists( report_path ):
+        os.remove( report_path )  # Never pick up the report of an earlier run
+
+    start = time.perf_counter()
+    try:
+        process = subprocess.run( command, capture_output=True, text=True, timeout=timeout )
+        failure = "Blender exited with code %d: %s" % ( process.returncode, process.stderr[-2000:] )
+    except subprocess.TimeoutExpired:
+        failure = "Timed out"
+    except OSError as error:  # Blender could not be started (e.g. a wrong --blender path)
+        failure = "Can't run %s: %s" % ( blender, error )
+    elapsed = time.perf_counter() - start
+
+    if os.path.exists( report_path ):
+        with open( report_path ) as report_file:
+            report = json.load( report_file )
+    else:
+        report = { "file": blend_path, "output": output_path, "status": "FAILED", "error": failure }
+
+    report["process_time"] = elapsed
+    return report
+
+def run_batch( argv ):
+    args, extra_args = parse_driver_args( argv )
+    os.makedirs( args.output_dir, exist_ok=True )
+
+    blend_files = sorted(
+        os.path.join( args.input_dir, file_name ) for file_name in os.listdir( args.input_dir )
+        if file_name.endswith( ".blend" ) )
+
+    # Every task waits for its own Blender process, so the pool size is the number of workers
+    start = time.perf_counter()
+    with ThreadPoolExecutor( max_workers=max( 1, args.workers ) ) as pool:
+        reports = list( pool.map(
+            lambda blend_path: run_worker( args.blender, blend_path, args.output_dir,
+                                           args.config, extra_args, args.timeout ),
+            blend_files ) )
+
+    summary = {
+        "files"    : len( reports ),
+        "finished" : sum( report.get( "status" ) == "FINISHED"  for report in reports ),
+        "cancelled": sum( report.get( "status" ) == "CANCELLED" for report in reports ),
+        "failed"   : sum( report.get( "status" ) not in ( "FINISHED", "CANCELLED" ) for report in reports ),
+        "workers"  : args.workers,
+        "wall_time": time.perf_counter() - start,
+        "reports"  : reports,
+        }
+    write_report( args.report or os.path.join( args.output_dir, "batch_report.json" ), summary )
+    return summary
+
+if __name__ == "__main__":
+    if bpy is None or "--input-dir" in sys.argv:
+        summary = run_batch( sys.argv[1:] )
+        sys.exit( 0 if summary["finished"] == summary["files"] else 1 )
+    else:
+        argv = sys.argv[ sys.argv.index( "--" ) + 1: ] if "--" in sys.argv else []
+        report = animate_file( argv )
+        sys.exit( 0 if report["status"] == "FINISHED" else 1 )
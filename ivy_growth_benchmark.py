@@ -0,0 +1,491 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+#  Benchmarks for the Ivy Growth Animator, on procedurally generated ivies.
+#
+#  Run the benchmark (inside headless Blender):
+#
+#      blender -b --factory-startup --python ivy_growth_benchmark.py -- \
+#              --sizes small,medium --output bench.json
+#
+#  Run it and flag regressions against a stored baseline (exits with 1 on regressions):
+#
+#      blender -b --factory-startup --python ivy_growth_benchmark.py -- \
+#              --sizes small,medium --output bench.json --baseline baseline.json
+#
+#  Benchmark only the computational core on generated arrays (plain Python, no Blender):
+#
+#      python ivy_growth_benchmark.py --core --sizes small,medium,large --processes 4
+#
+#  Compare two stored results without running anything (plain Python is enough):
+#
+#      python ivy_growth_benchmark.py --compare bench.json --baseline baseline.json
+#
+#  A size is either one of the presets below or "name:splines:faces_per_branch:leaves".
+
+import argparse, json, math, os, random, sys, tempfile, time, tracemalloc
+
+try:
+    import bpy
+except ImportError:  # Only comparing results, outside of Blender
+    bpy = None
+
+import numpy as np
+
+sys.path.insert( 0, os.path.dirname( os.path.abspath( __file__ ) ) )
+from ivy_growth_batch import register_addon, write_report
+import ivy_growth.core as ivy_growth_core
+from ivy_growth.core import peak_rss_mb
+
+# splines, faces per branch, leaves
+SIZES = {
+    "small"  : (  10,  200,   500 ),
+    "medium" : (  50,  500,  5000 ),
+    "large"  : ( 200, 1000, 20000 ),
+    }
+
+# Settings of the presets, applied before --set. A shape key per leaf holds the whole leaves mesh,
+# so the large ivy's 20,000 shape keys would need about 19 GB: it is animated with attributes
+SIZE_SETTINGS = {
+    "large" : ( "leaves.growth_mode=ATTRIBUTE", ),
+    }
+
+STAGES = ( "prepare_ivy_object", "find_ivy_branches", "set_build_timing", "animate_leaves",
+           "bake_growth", "playback_frame" )
+
+BEVEL_RESOLUTION = 1
+RING_FACES       = 2 * BEVEL_RESOLUTION + 4  # Faces around one segment of a beveled spline
+
+# ---------------------------------------------------------------------------
+# Synthetic ivy
+# ---------------------------------------------------------------------------
+
+def generate_ivy( name, splines, faces_per_branch, leaves, seed=0 ):
+    """ function name:  generate_ivy
+        parameters:     name             [String] - Name of the ivy curve object
+                        splines          [Int]    - Number of branches (splines) of the ivy curve
+                        faces_per_branch [Int]    - Number of faces of every branch, once converted to a mesh
+                        leaves           [Int]    - Number of leaves
+                        seed             [Int]    - Seed of the random generator
+        description:    Generates an ivy-like beveled poly curve climbing from the origin, whose branches
+                        fork off random points of earlier branches, and a mesh with one quad per leaf
+                        placed next to random points of the branches
+        return value:   The ivy curve object and the leaves object
+    """
+    rnd    = random.Random( seed )
+    points = max( 2, faces_per_branch // RING_FACES + 1 )
+
+    curve = bpy.data.curves.new( name, 'CURVE' )
+    curve.dimensions       = '3D'
+    curve.bevel_depth      = 0.01
+    curve.bevel_resolution = BEVEL_RESOLUTION
+
+    branch_points = []
+    for spline_idx in range( splines ):
+        spline = curve.splines.new( 'POLY' )
+        spline.points.add( points - 1 )
+
+        x, y, z = rnd.choice( branch_points ) if branch_points else ( 0.0, 0.0, 0.0 )
+        heading = rnd.uniform( 0, 2 * math.pi )
+        for point in spline.points:
+            point.co = ( x, y, z, 1.0 )
+            branch_points.append( ( x, y, z ) )
+            heading += rnd.uniform( -0.4, 0.4 )
+            x += 0.05 * math.cos( heading )
+            y += 0.05 * math.sin( heading )
+            z += rnd.uniform( 0.0, 0.05 )
+
+    ivy = bpy.data.objects.new( name, curve )
+    bpy.context.scene.collection.objects.link( ivy )
+
+    vertices = []
+    faces    = []
+    for leaf_idx in range( leaves ):
+        cx, cy, cz = ( c + rnd.uniform( -0.05, 0.05 ) for c in rnd.choice( branch_points ) )
+        angle = rnd.uniform( 0, 2 * math.pi )
+        dx, dy = 0.03 * math.cos( angle ), 0.03 * math.sin( angle )
+        base = len( vertices )
+        vertices += [ ( cx, cy, cz ), ( cx + dx, cy + dy, cz ),
+                      ( cx + dx, cy + dy, cz + 0.03 ), ( cx, cy, cz + 0.03 ) ]
+        faces.append( ( base, base + 1, base + 2, base + 3 ) )
+
+    mesh = bpy.data.meshes.new( "Leaves" )
+    mesh.from_pydata( vertices, [], faces )
+    leaves_obj = bpy.data.objects.new( "Leaves", mesh )
+    bpy.context.scene.collection.objects.link( leaves_obj )
+
+    return ivy, leaves_obj
+
+def generate_core_arrays( splines, faces_per_branch, leaves, seed=0 ):
+    """ function name:  generate_core_arrays
+        description:    The arrays the core works on, for an ivy like the one generate_ivy makes:
+                        face centers of branches that random walk up from a point of an earlier
+                        branch, and leaf centers next to random face centers
+        return value:   Face centers, branch of every face, and leaf centers
+    """
+    rng     = np.random.default_rng( seed )
+    steps   = rng.normal( 0, 0.03, ( splines, faces_per_branch, 3 ) )
+    steps[..., 2] = np.abs( steps[..., 2] )  # Climbing
+
+    branches = np.cumsum( steps, axis=1 )
+    for branch in range( 1, splines ):
+        fork = branches[ rng.integers( branch ), rng.integers( faces_per_branch ) ]
+        branches[branch] += fork
+
+    centers     = branches.reshape( -1, 3 )
+    face_branch = np.repeat( np.arange( splines ), faces_per_branch )
+    leaf_co     = centers[ rng.integers( len( centers ), size=leaves ) ] + rng.normal( 0, 0.05, ( leaves, 3 ) )
+    return centers, face_branch, leaf_co
+
+def triangles( centers, size=0.01 ):
+    """ Returns a mesh dictionary (see ivy_growth.core.reorder_faces) with a triangle at every center """
+    count   = len( centers )
+    corners = np.array( [ ( 0, 0, 0 ), ( size, 0, 0 ), ( 0, 0, size ) ] )
+    return {
+        "co"            : ( centers[:, None, :] + corners ).reshape( -1, 3 ).astype( np.float32 ),
+        "loop_total"    : np.full( count, 3, dtype=np.int32 ),
+        "material"      : np.zeros( count, dtype=np.int32 ),
+        "smooth"        : np.zeros( count, dtype=bool ),
+        "loop_vertices" : np.arange( count * 3, dtype=np.int32 ),
+        "uv"            : np.zeros( ( count * 3, 2 ), dtype=np.float32 ),
+        }
+
+def clear_scene():
+    """ Removes everything a previous run created """
+    for collection in ( bpy.data.objects, bpy.data.meshes, bpy.data.curves, bpy.data.actions,
+                        bpy.data.shape_keys, bpy.data.node_groups ):
+        if len( collection ):
+            bpy.data.batch_remove( list( collection ) )
+
+# ---------------------------------------------------------------------------
+# Measurements
+# ---------------------------------------------------------------------------
+
+class StageTimer:
+    """ Measures the wall time and the memory high-water mark of every stage of a run. With
+        trace_memory, the memory is traced with tracemalloc, restarted for every stage, so each
+        stage gets its own peak of the Python and NumPy memory it allocated (Blender's own
+        allocations are not seen). Tracing slows Python code down a lot, so traced times are not
+        comparable. The process high-water mark (ru_maxrss) is recorded too, but it only ever
+        grows over a run
+    """
+
+    def __init__( self, trace_memory=False ):
+        self.stages       = {}
+        self.trace_memory = trace_memory
+
+    def run( self, stage, function, *args ):
+        tracing = tracemalloc.is_tracing()
+        if self.trace_memory:
+            if not tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        try:
+            base    = tracemalloc.get_traced_memory()[0]
+            start   = time.perf_counter()
+            result  = function( *args )
+            elapsed = time.perf_counter() - start
+            peak    = tracemalloc.get_traced_memory()[1] - base
+        finally:
+            if self.trace_memory and not tracing:
+                tracemalloc.stop()
+
+        self.stages[stage] = { "time": elapsed, "peak_rss_mb": peak_rss_mb() }
+        if self.trace_memory:
+            self.stages[stage]["peak_mb"] = peak / ( 1024 * 1024 )
+        return result
+
+def apply_settings( scene, settings ):
+    """ Sets "group.property=value" settings, e.g. "leaves.growth_mode=ATTRIBUTE", on top of the
+        defaults (the settings of the size that ran before are reset)
+    """
+    groups = { "branches": scene.BranchesAnimProperties, "leaves": scene.LeavesAnimProperties,
+               "bake": scene.BakeProperties }
+    for props in groups.values():
+        for prop in props.bl_rna.properties:
+            if prop.identifier != "rna_type":
+                props.property_unset( prop.identifier )
+    for setting in settings:
+        path, value = setting.split( "=", 1 )
+        group, identifier = path.split( "." )
+        props = groups[group]
+        current = getattr( props, identifier )
+        if isinstance( current, bool ):
+            value = value.lower() in ( "1", "true", "yes", "on" )
+        elif isinstance( current, ( int, float ) ):
+            value = type( current )( value )
+        setattr( props, identifier, value )
+
+def run_size( name, splines, faces_per_branch, leaves, settings, seed, trace_memory=False ):
+    """ function name:  run_size
+        description:    Generates an ivy of the given size and runs every stage of the animation on it
+        return value:   Dictionary with the time and memory of every stage, and the generated counts
+    """
+    clear_scene()
+
+    scene = bpy.context.scene
+    apply_settings( scene, settings )
+    ivy, leaves_obj = generate_ivy( "BenchIvy", splines, faces_per_branch, leaves, seed )
+    scene.BranchObject = ivy.name
+    scene.LeavesObject = leaves_obj.name
+
+    branch_props = scene.BranchesAnimProperties
+    leaves_props = scene.LeavesAnimProperties
+    timer        = StageTimer( trace_memory )
+
+    object_name = timer.run( "prepare_ivy_object", branch_props.prepare_ivy_object, branch_props.modifier_name )
+    ivy_objects = timer.run( "find_ivy_branches",  branch_props.find_ivy_branches,  object_name )
+
+    timer.run( "set_build_timing", branch_props.time_branches, ivy_objects )
+
+    timer.run( "animate_leaves", leaves_props.animate_leaves, leaves_obj.name, ivy_objects )
+
+    # Baking, and rebuilding one frame of the playback object from the cache
+    from ivy_growth.addon import write_playback_mesh
+    bake_props = scene.BakeProperties
+    bake_props.bake_filepath = os.path.join( tempfile.gettempdir(), "ivy_benchmark_%s.npz" % name )
+    cache = timer.run( "bake_growth", bake_props.bake_growth, ivy_objects, leaves_obj )
+    timer.run( "playback_frame", write_playback_mesh,
+               bpy.data.meshes.new( "BenchPlayback" ), cache, cache.frame_range.mean() )
+
+    return {
+        "size"   : { "splines": splines, "faces_per_branch": faces_per_branch, "leaves": leaves },
+        "counts" : { "branches": len( ivy_objects ),
+                     "branch_faces": sum( branch["facecount"] for branch in ivy_objects ),
+                     "leaves": len( leaves_obj.data.polygons ) },
+        "stages" : timer.stages,
+        }
+
+def run_core_size( name, splines, faces_per_branch, leaves, processes, seed, trace_memory=False ):
+    """ function name:  run_core_size
+        description:    Runs the computational core (timing, nearest branch assignment, camera culling
+                        and baking) on the arrays of an ivy of the given size, without Blender
+        return value:   Dictionary with the time and memory of every stage, and the generated counts
+    """
+    centers, face_branch, leaf_co = generate_core_arrays( splines, faces_per_branch, leaves, seed )
+    facecounts = np.bincount( face_branch )
+    timer      = StageTimer( trace_memory )
+
+    def build_timing():
+        schedule = ivy_growth_core.schedule_branches( facecounts, 1, 0, 0, 4 )
+        ivy_growth_core.compute_appear_frames( face_branch, schedule["start"], schedule["duration"] )
+        return schedule
+
+    def leaf_timing():
+        draws = ivy_growth_core.draw_leaf_timing( leaves, 10, 25, 50, seed )
+        return ivy_growth_core.schedule_leaves( branch_schedule, leaf_branches, draws )
+
+    def leaf_culling():
+        # A 50 mm, 1920x1080 camera in front of the ivy, twice its size away from its center
+        low, high = leaf_co.min( axis=0 ), leaf_co.max( axis=0 )
+        eye  = ( low + high ) / 2 - ( 0, 2 * ( high - low ).max(), 0 )
+        view = np.array( [ [ 1, 0, 0, -eye[0] ], [ 0, 0, 1, -eye[2] ], [ 0, -1, 0, eye[1] ], [ 0, 0, 0, 1 ] ] )
+        focal, near, far = 50 / 18, 0.1, 1000.0
+        projection = np.array( [ [ focal, 0, 0, 0 ], [ 0, focal * 16 / 9, 0, 0 ],
+                                 [ 0, 0, ( far + near ) / ( near - far ), 2 * far * near / ( near - far ) ],
+                                 [ 0, 0, -1, 0 ] ] )
+        classes = ivy_growth_core.classify_leaves(
+            leaf_co, np.full( leaves, 0.01 ), projection @ view, ( 1920, 1080 ), 2.0 )
+        return ivy_growth_core.cluster_leaves( leaf_co, classes, 16 )
+
+    def bake_growth():
+        # A triangle around every face and leaf center stands in for the meshes
+        appear = ivy_growth_core.face_appear_frames(
+            branch_schedule, face_branch, ivy_growth_core.build_positions( face_branch, splines ) )
+        return ivy_growth_core.GrowthCache.build(
+            triangles( centers ), appear, triangles( leaf_co ),
+            leaf_schedule["start"], leaf_schedule["end"], 'SMOOTH' )
+
+    branch_schedule = timer.run( "build_timing", build_timing )
+    leaf_branches   = timer.run( "assign_branches", ivy_growth_core.assign_nearest,
+                                 centers, face_branch, leaf_co, 1 )
+    if processes > 1:
+        timer.run( "assign_branches_pool", ivy_growth_core.assign_nearest,
+                   centers, face_branch, leaf_co, processes )
+    if bpy is not None:
+        # The add-on's in-process search, with Blender's KD-tree when SciPy is missing
+        from ivy_growth.addon import KDTreeIndex
+
+        def assign_kdtree():
+            return face_branch[ KDTreeIndex( centers ).query( leaf_co ) ]
+
+        timer.run( "assign_branches_kdtree", assign_kdtree )
+    leaf_schedule = timer.run( "leaf_timing", leaf_timing )
+    timer.run( "leaf_culling", leaf_culling )
+    cache = timer.run( "bake_growth", bake_growth )
+    timer.run( "playback_frame", cache.frame, cache.frame_range.mean() )
+
+    return {
+        "size"   : { "splines": splines, "faces_per_branch": faces_per_branch, "leaves": leaves },
+        "counts" : { "branches": splines, "branch_faces": len( centers ), "leaves": leaves },
+        "stages" : timer.stages,
+        }
+
+def parse_size( size ):
+    if size in SIZES:
+        return ( size, ) + SIZES[size]
+    name, splines, faces, leaves = size.split( ":" )
+    return name, int( splines ), int( faces ), int( leaves )
+
+def run_benchmark( args ):
+    if args.core:
+        results = { "core": True, "processes": args.processes }
+    else:
+        register_addon()
+        results = { "blender": bpy.app.version_string, "settings": args.set }
+    results.update( { "repeat": args.repeat, "sizes": {} } )
+
+    for size in args.sizes.split( "," ):
+        name, splines, faces, leaves = parse_size( size )
+
+        def run_once( trace_memory ):
+            if args.core:
+                return run_core_size( name, splines, faces, leaves, args.processes, args.seed, trace_memory )
+            settings = list( SIZE_SETTINGS.get( name, () ) ) + args.set
+            return run_size( name, splines, faces, leaves, settings, args.seed, trace_memory )
+
+        # Keep the fastest time and the highest memory of all repeats
+        best = None
+        for repeat in range( args.repeat ):
+            run = run_once( False )
+            if best is None:
+                best = run
+                continue
+            for stage, measured in run["stages"].items():
+                best_stage = best["stages"][stage]
+                best_stage["time"] = min( best_stage["time"], measured["time"] )
+                if measured["peak_rss_mb"] is not None:
+                    best_stage["peak_rss_mb"] = max( best_stage["peak_rss_mb"], measured["peak_rss_mb"] )
+
+        # Tracing the memory slows the stages down, so it gets a run of its own (its times are dropped)
+        for stage, measured in run_once( True )["stages"].items():
+            best["stages"][stage]["peak_mb"] = measured["peak_mb"]
+
+        if not args.core:
+            best["settings"] = list( SIZE_SETTINGS.get( name, () ) ) + args.set
+        results["sizes"][name] = best
+        print( "Ivy benchmark - %s: %s" % ( name, ", ".join(
+            "%s %.3fs %.1f MB" % ( stage, measured["time"], measured["peak_mb"] )
+            for stage, measured in best["stages"].items() ) ) )
+
+    return results
+
+# ---------------------------------------------------------------------------
+# Comparison with a baseline
+# ---------------------------------------------------------------------------
+
+# Compared measurements of every stage: result key, unit, and the option with its noise threshold
+METRICS = ( ( "time", "s", "min_seconds" ), ( "peak_mb", "MB", "min_mb" ) )
+
+def compare( results, baseline, tolerance, min_seconds, min_mb=1.0 ):
+    """ function name:  compare
+        parameters:     results     [Dict]  - Benchmark results
+                        baseline    [Dict]  - Stored benchmark results to compare against
+                        tolerance   [Float] - Allowed increase ratio (0.2 = 20% slower or bigger)
+                        min_seconds [Float] - Time differences smaller than this are treated as noise
+                        min_mb      [Float] - Memory differences smaller than this are treated as noise
+        description:    Compares the time and peak memory of every stage of every size the two results
+                        have in common (baselines stored without a peak memory only compare the time)
+        return value:   List of all comparisons, the regressions have "regression" set
+    """
+    noise       = { "min_seconds": min_seconds, "min_mb": min_mb }
+    comparisons = []
+    for size, run in results["sizes"].items():
+        base_run = baseline["sizes"].get( size )
+        if base_run is None:
+            continue
+        for stage, measured in run["stages"].items():
+            base_stage = base_run["stages"].get( stage )
+            if base_stage is None:
+                continue
+
+            for metric, unit, threshold in METRICS:
+                current, previous = measured.get( metric ), base_stage.get( metric )
+                if current is None or previous is None:
+                    continue
+                ratio = current / previous if previous > 0 else float( "inf" )
+                comparisons.append( {
+                    "size"       : size,
+                    "stage"      : stage,
+                    "metric"     : metric,
+                    "unit"       : unit,
+                    "value"      : current,
+                    "baseline"   : previous,
+                    "ratio"      : ratio,
+                    "regression" : ratio > 1 + tolerance and current - previous > noise[threshold],
+                    } )
+    return comparisons
+
+def print_comparison( comparisons ):
+    for comparison in comparisons:
+        print( "%-8s %-20s %-8s %9.3f%-2s  baseline %9.3f%-2s  x%.2f%s" % (
+            comparison["size"], comparison["stage"], comparison["metric"],
+            comparison["value"], comparison["unit"], comparison["baseline"], comparison["unit"],
+            comparison["ratio"], "  REGRESSION" if comparison["regression"] else "" ) )
+
+def parse_args( argv ):
+    parser = argparse.ArgumentParser(
+        prog="blender -b --factory-startup --python ivy_growth_benchmark.py --",
+        description="Benchmark the Ivy Growth Animator on generated ivies" )
+    parser.add_argument( "--sizes",  default="small,medium",
+                         help="Comma separated presets (%s) or name:splines:faces_per_branch:leaves"
+                              % ", ".join( SIZES ) )
+    parser.add_argument( "--repeat", type=int, default=1, help="Runs per size (the fastest is kept)" )
+    parser.add_argument( "--seed",   type=int, default=0, help="Seed of the ivy generator" )
+    parser.add_argument( "--set",    action="append", default=[],
+                         help="Animation setting as group.property=value, e.g. leaves.growth_mode=ATTRIBUTE" )
+    parser.add_argument( "--core",   action="store_true",
+                         help="Only benchmark the computational core on generated arrays (no Blender needed)" )
+    parser.add_argument( "--processes", type=int, default=os.cpu_count(),
+                         help="Worker processes of the pooled nearest branch assignment (--core)" )
+    parser.add_argument( "--output", help="Where to write the JSON results (default: print them)" )
+    parser.add_argument( "--compare",  help="Compare these stored results instead of running the benchmark" )
+    parser.add_argument( "--baseline", help="Stored results to flag regressions against" )
+    parser.add_argument( "--tolerance",   type=float, default=0.2,
+                         help="Allowed slowdown or memory growth before a stage is flagged (0.2 = 20%%)" )
+    parser.add_argument( "--min-seconds", type=float, default=0.05,
+                         help="Ignore slowdowns smaller than this many seconds" )
+    parser.add_argument( "--min-mb",      type=float, default=1.0,
+                         help="Ignore peak memory growth smaller than this many MB" )
+    return parser.parse_args( argv )
+
+def main( argv ):
+    args = parse_args( argv )
+
+    if args.compare:
+        with open( args.compare ) as results_file:
+            results = json.load( results_file )
+    elif bpy is None and not args.core:
+        sys.exit( "Running the benchmark needs Blender, only --core and --compare work in plain Python" )
+    else:
+        results = run_benchmark( args )
+        write_report( args.output, results )
+
+    if not args.baseline:
+        return 0
+
+    with open( args.baseline ) as baseline_file:
+        baseline = json.load( baseline_file )
+
+    comparisons = compare( results, baseline, args.tolerance, args.min_seconds, args.min_mb )
+    print_comparison( comparisons )
+    return 1 if any( comparison["regression"] for comparison in comparisons ) else 0
+
+if __name__ == "__main__":
+    argv = sys.argv[ sys.argv.index( "--" ) + 1: ] if "--" in sys.argv else sys.argv[1:]
+    sys.exit( main( argv ) )
@@ -0,0 +1,239 @@
+#  Tests of the computational core of the Ivy Growth Animator (plain Python, no Blender):
+#
+#      python -m pytest -q tests
+
+import os, sys
+
+import numpy as np
+import pytest
+
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
+import ivy_growth.core as core
+from ivy_growth.core import (
+    BRANCH_SCHEDULE_DTYPE, LEAF_ANIMATED, LEAF_CLUSTERED, LEAF_STATIC, GrowthCache, ManhattanIndex, NearestPool,
+    assign_nearest, build_positions, classify_leaves, compute_appear_frames, draw_leaf_timing, find_loose_parts,
+    schedule_leaves )
+
+def brute_force_distances( points, queries ):
+    """ The manhattan distance from every query to its nearest point """
+    return np.abs( queries[:, None, :] - points[None, :, :] ).sum( axis=2 ).min( axis=1 )
+
+def triangles( centers, size=0.1 ):
+    """ A mesh dictionary (see ivy_growth.core.reorder_faces) with a triangle at every center """
+    count   = len( centers )
+    corners = np.array( [ ( 0, 0, 0 ), ( size, 0, 0 ), ( 0, 0, size ) ] )
+    return {
+        "co"            : ( centers[:, None, :] + corners ).reshape( -1, 3 ).astype( np.float32 ),
+        "loop_total"    : np.full( count, 3, dtype=np.int32 ),
+        "material"      : np.arange( count, dtype=np.int32 ) % 2,
+        "smooth"        : np.zeros( count, dtype=bool ),
+        "loop_vertices" : np.arange( count * 3, dtype=np.int32 ),
+        "uv"            : np.zeros( ( count * 3, 2 ), dtype=np.float32 ),
+        }
+
+# ---------------------------------------------------------------------------
+# Nearest branch
+# ---------------------------------------------------------------------------
+
+def test_manhattan_index_matches_brute_force( monkeypatch ):
+    monkeypatch.setattr( core, "cKDTree", None )  # The NumPy search, even where SciPy is installed
+    rng     = np.random.default_rng( 1 )
+    points  = rng.normal( size=( 3000, 3 ) ) * ( 4, 1, 2 )
+    queries = rng.normal( size=( 500, 3 ) ) * ( 5, 2, 2 )
+
+    nearest  = ManhattanIndex( points ).query( queries )
+    measured = np.abs( queries - points[nearest] ).sum( axis=1 )
+    assert np.allclose( measured, brute_force_distances( points, queries ) )
+
+def test_manhattan_index_few_and_repeated_points():
+    points  = np.array( [ ( 0, 0, 0 ), ( 1, 0, 0 ), ( 1, 0, 0 ), ( 0, 5, 0 ) ], dtype=float )
+    queries = np.array( [ ( 0.9, 0, 0 ), ( 0, 4, 0 ), ( -1, -1, -1 ) ] )
+
+    nearest = ManhattanIndex( points ).query( queries )
+    assert np.allclose( np.abs( queries - points[nearest] ).sum( axis=1 ),
+                        brute_force_distances( points, queries ) )
+
+def test_manhattan_index_without_points():
+    assert ManhattanIndex( np.empty( ( 0, 3 ) ) ).query( np.zeros( ( 2, 3 ) ) ).tolist() == [ -1, -1 ]
+
+def test_nearest_pool_matches_single_process():
+    rng     = np.random.default_rng( 2 )
+    points  = rng.uniform( -1, 1, size=( 2000, 3 ) )
+    labels  = np.arange( len( points ) ) // 100
+    queries = rng.uniform( -1, 1, size=( 1000, 3 ) )
+
+    single = ManhattanIndex( points ).query( queries )
+    with NearestPool( points, 2, min_chunk=100 ) as pool:
+        pending = pool.query_async( queries )
+        assert np.array_equal( NearestPool.result( pending ), single )
+
+    assert np.array_equal( assign_nearest( points, labels, queries, processes=2, min_chunk=100 ),
+                           assign_nearest( points, labels, queries, processes=1 ) )
+
+# ---------------------------------------------------------------------------
+# Loose parts
+# ---------------------------------------------------------------------------
+
+def reference_loose_parts( vert_count, edges ):
+    """ One edge at a time union-find, parts numbered by their first vertex """
+    parent = list( range( vert_count ) )
+
+    def root( vertex ):
+        while parent[vertex] != vertex:
+            parent[vertex] = parent[ parent[vertex] ]
+            vertex = parent[vertex]
+        return vertex
+
+    for vert_a, vert_b in edges.tolist():
+        root_a, root_b = root( vert_a ), root( vert_b )
+        if root_a != root_b:
+            parent[ max( root_a, root_b ) ] = min( root_a, root_b )
+
+    roots = [ root( vertex ) for vertex in range( vert_count ) ]
+    parts = { part_root : part for part, part_root in enumerate( sorted( set( roots ) ) ) }
+    return np.array( [ parts[part_root] for part_root in roots ] )
+
+def test_find_loose_parts_matches_reference_union_find():
+    rng = np.random.default_rng( 3 )
+    for vert_count, edge_count in ( ( 1, 0 ), ( 10, 0 ), ( 50, 20 ), ( 500, 400 ), ( 500, 2000 ) ):
+        edges = rng.integers( 0, vert_count, size=( edge_count, 2 ) )
+        assert np.array_equal( find_loose_parts( vert_count, edges ),
+                               reference_loose_parts( vert_count, edges ) )
+
+def test_find_loose_parts_chain():
+    # A chain linked from its far end needs several rounds of hooking
+    edges = np.array( [ ( 4, 5 ), ( 3, 4 ), ( 2, 3 ), ( 7, 8 ) ] )
+    assert find_loose_parts( 9, edges ).tolist() == [ 0, 1, 2, 2, 2, 2, 3, 4, 4 ]
+
+# ---------------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------------
+
+def test_build_positions():
+    face_parts = np.array( [ 0, 1, 0, 0, 1, 2 ] )
+    assert np.allclose( build_positions( face_parts, 3 ), [ 1 / 3, 1 / 2, 2 / 3, 1, 1, 1 ] )
+
+def test_compute_appear_frames():
+    face_parts = np.array( [ 0, 1, 0, 0, 1 ] )
+    starts     = np.array( [ 10.0, 20.0 ] )
+    durations  = np.array( [ 6.0, 0.0 ] )  # Clamped to one frame, like the build modifier
+    assert np.allclose( compute_appear_frames( face_parts, starts, durations ),
+                        [ 12.0, 20.5, 14.0, 16.0, 21.0 ] )
+
+def test_draw_leaf_timing_is_seeded():
+    first  = draw_leaf_timing( 200, 10, 5, 15, seed=4 )
+    second = draw_leaf_timing( 200, 10, 5, 15, seed=4 )
+    other  = draw_leaf_timing( 200, 10, 5, 15, seed=5 )
+
+    assert np.array_equal( first, second )
+    assert not np.array_equal( first, other )
+    assert first["delay"].min() >= 0 and first["delay"].max() <= 10
+    assert first["length"].min() >= 5 and first["length"].max() <= 15
+
+def test_schedule_leaves_is_reproducible_and_chunk_independent():
+    branch_schedule = np.array( [ ( 1, 20 ), ( 11, 40 ) ], dtype=BRANCH_SCHEDULE_DTYPE )
+    leaf_branches   = np.array( [ 0, 1, 1, -1, 0, 1 ] )
+    leaf_positions  = np.linspace( 0.1, 1.0, len( leaf_branches ) )
+
+    for distribution in ( 'UNIFORM', 'NORMAL', 'DISTANCE' ):
+        draws    = draw_leaf_timing( len( leaf_branches ), 10, 5, 15, 7, distribution )
+        schedule = schedule_leaves( branch_schedule, leaf_branches, draws, distribution, leaf_positions )
+        again    = schedule_leaves( branch_schedule, leaf_branches,
+                                    draw_leaf_timing( len( leaf_branches ), 10, 5, 15, 7, distribution ),
+                                    distribution, leaf_positions )
+        assert np.array_equal( schedule, again )
+
+        chunks = np.concatenate( [ schedule_leaves( branch_schedule, leaf_branches[ start : start + 4 ],
+                                                    draws[ start : start + 4 ], distribution,
+                                                    leaf_positions[ start : start + 4 ] )
+                                   for start in range( 0, len( leaf_branches ), 4 ) ] )
+        assert np.array_equal( schedule, chunks )
+
+        assert np.array_equal( schedule["branch"], leaf_branches )
+        assert np.allclose( schedule["end"] - schedule["start"], draws["length"] )
+
+    # Every leaf starts its delay after its branch is built
+    draws    = draw_leaf_timing( len( leaf_branches ), 10, 5, 15, 7 )
+    schedule = schedule_leaves( branch_schedule, leaf_branches, draws )
+    built    = np.array( [ 21, 51, 51, 0, 21, 51 ] )
+    assert np.allclose( schedule["start"], built + draws["delay"] )
+
+# ---------------------------------------------------------------------------
+# Camera culling
+# ---------------------------------------------------------------------------
+
+def test_classify_leaves_orthographic():
+    # A camera at the origin looking down -z, seeing 4 x 4 units
+    view       = np.eye( 4 )
+    projection = np.diag( [ 0.5, 0.5, -0.02, 1.0 ] )
+    projection[2, 3] = -1.0
+    centers = np.array( [ ( 0, 0, -5 ), ( 0, 0, 5 ), ( 10, 0, -5 ), ( 1, 1, -5 ) ], dtype=float )
+    radii   = np.array( [ 0.1, 0.1, 2.0, 0.0001 ] )  # w is 1, the big leaf is not around the camera
+
+    classes = classify_leaves( centers, radii, [ projection @ view ], ( 100, 100 ), 2.0,
+                               [ view ], orthographic=True )
+    assert classes.tolist() == [ LEAF_ANIMATED, LEAF_STATIC, LEAF_STATIC, LEAF_CLUSTERED ]
+
+    with pytest.raises( ValueError ):
+        classify_leaves( centers, radii, [ projection @ view ], ( 100, 100 ), 2.0, orthographic=True )
+
+# ---------------------------------------------------------------------------
+# Growth cache
+# ---------------------------------------------------------------------------
+
+def make_cache():
+    branch_centers = np.array( [ ( x, 0, 0 ) for x in range( 5 ) ], dtype=float )
+    leaf_centers   = np.array( [ ( x, 1, 0 ) for x in range( 4 ) ], dtype=float )
+    face_appear    = np.array( [ 5.0, 1.0, 3.0, 2.0, 4.0 ] )
+    leaf_start     = np.array( [ 8.0, 6.0, -1048576.0, 7.0 ] )  # The third leaf is always grown
+    leaf_end       = np.array( [ 12.0, 9.0, -1048575.0, 10.0 ] )
+    return GrowthCache.build( triangles( branch_centers ), face_appear, triangles( leaf_centers ),
+                              leaf_start, leaf_end, 'SMOOTH', [ "Bark", "Leaf" ] )
+
+def test_growth_cache_frames():
+    cache = make_cache()
+    assert cache.frame_range.tolist() == [ 1.0, 12.0 ]
+
+    co, faces, loops = cache.frame( 3.0 )
+    assert faces.tolist() == [ 0, 1, 2, 5 ]  # Three branch faces, and the always grown leaf
+    assert len( loops ) == 3 * len( faces )
+    assert np.allclose( co[ cache.vertex_leaf == 0 ], cache.co[ cache.vertex_leaf == 0 ] )
+
+    co, faces, loops = cache.frame( 100.0 )
+    assert len( faces ) == 9
+    assert np.allclose( co, cache.co )
+
+    # A leaf half way through its growth has half its size
+    co, faces, loops = cache.frame( 7.5 )
+    leaf     = int( np.flatnonzero( cache.leaf_start == 6.0 )[0] )
+    vertices = cache.vertex_leaf == leaf
+    assert np.allclose( co[vertices] - cache.leaf_centers[leaf],
+                        ( cache.co[vertices] - cache.leaf_centers[leaf] ) * 0.5 )
+
+def test_growth_cache_never_grown_leaves():
+    leaf_centers = np.array( [ ( x, 1, 0 ) for x in range( 2 ) ], dtype=float )
+    cache = GrowthCache.build( triangles( np.zeros( ( 1, 3 ) ) ), np.array( [ 1.0 ] ), triangles( leaf_centers ),
+                               np.array( [ 2.0, 1048575.0 ] ), np.array( [ 4.0, 1048576.0 ] ),  # The second is never grown
+                               'LINEAR', [ "Bark", "Leaf" ] )
+    assert cache.frame_range.tolist() == [ 1.0, 4.0 ]
+
+    co, faces, loops = cache.frame( 100.0 )
+    assert faces.tolist() == [ 0, 1 ]  # The branch face, and the leaf that was grown
+
+def test_growth_cache_save_load_roundtrip( tmp_path ):
+    cache    = make_cache()
+    filepath = str( tmp_path / "growth.npz" )
+    cache.save( filepath )
+    loaded   = GrowthCache.load( filepath )
+
+    for key in GrowthCache.ARRAYS:
+        assert np.array_equal( getattr( loaded, key ), getattr( cache, key ) ), key
+    for frame in ( 0.0, 2.5, 6.0, 8.0, 11.0, 20.0 ):
+        for expected, actual in zip( cache.frame( frame ), loaded.frame( frame ) ):
+            assert np.array_equal( expected, actual )
+
+def test_growth_cache_rejects_other_versions( tmp_path ):
+    filepath = str( tmp_path / "other.npz" )
+    np.savez( filepath, version=0 )
+    with pytest.raises( ValueError ):
+        GrowthCache.load( filepath )